@@ -1,10 +1,12 @@
 # backend/app/agents/chat_agent.py
+import asyncio
 import time
 from typing import List, Dict, Any, Optional
+import httpx
 from agent_framework import AssistantsClient, Tool
 from ..tools.memory_tool import MemoryTool
 from ..tools.rag_tool import RAGTool
-from ..tools.attachment_tool import AttachmentTool
+from ..tools.attachment_tool import AttachmentTool, PendingEmbedding
 from ..tools.escalation_tool import EscalationTool
 from ..core.logging import logger
 from ..core.config import settings
@@ -13,10 +15,21 @@ class ChatAgent:
     """Customer support chat agent using Microsoft Agent Framework"""
     
     def __init__(self):
+        # Persistent HTTP client so every Agent Framework call reuses pooled
+        # keep-alive connections instead of opening a new one per request.
+        # The SDK's calls are synchronous, so this must be the sync client;
+        # an async transport can't serve them
+        self._http = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=30
+        )
+
         # Initialize the Assistants client
         self.client = AssistantsClient(
             endpoint=settings.agent_framework_endpoint,
-            api_key=settings.agent_framework_api_key
+            api_key=settings.agent_framework_api_key,
+            http_client=self._http
         )
         
         # Initialize tools
@@ -51,7 +64,11 @@ class ChatAgent:
         
         # Create or get the assistant
         self.assistant = self._create_or_get_assistant()
-    
+
+    def close(self):
+        """Release the pooled HTTP client's connections"""
+        self._http.close()
+
     def _create_or_get_assistant(self):
         """Create or retrieve the assistant"""
         assistant_instructions = """
@@ -80,13 +97,18 @@ class ChatAgent:
             tools=self.tools
         )
     
-    def create_thread(self, session_id: str, user_id: Optional[str] = None) -> str:
+    def create_thread(self, session_id: str, user_id: Optional[str] = None, db=None) -> str:
         """Create a new conversation thread"""
         # Create thread in Agent Framework
         thread = self.client.create_thread()
-        
-        # Store thread mapping in memory
-        self.memory_tool.store_thread_mapping(session_id, thread.id, user_id)
+
+        # Store thread mapping in memory, reusing the caller's db session
+        # (and transaction) when one is provided
+        result = self.memory_tool.store_thread_mapping(session_id, thread.id, user_id, db=db)
+        if "error" in result:
+            # The tool swallows its own exceptions into an error dict; a
+            # session whose row never persisted must not look created
+            raise RuntimeError(result["error"])
         
         logger.info(
             f"Created new thread {thread.id} for session {session_id}",
@@ -95,10 +117,10 @@ class ChatAgent:
         
         return thread.id
     
-    def send_message(
-        self, 
-        session_id: str, 
-        message: str, 
+    async def send_message(
+        self,
+        session_id: str,
+        message: str,
         attachments: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
         """Send a message to the agent and get a response"""
@@ -107,30 +129,61 @@ class ChatAgent:
         # Get thread ID for this session
         thread_id = self.memory_tool.get_thread_id(session_id)
         if not thread_id:
-            thread_id = self.create_thread(session_id)
-        
-        # Process attachments if any
+            # create_thread is a synchronous network call, so keep it off
+            # the event loop like the other SDK round-trips below
+            thread_id = await asyncio.to_thread(self.create_thread, session_id)
+
+        # Process attachments if any, collecting extracted text so all chunks
+        # are embedded in batches instead of one backend call per attachment.
+        # Conversion, hashing and the embedding forward passes are all
+        # CPU/disk-bound, so they run in worker threads too
         if attachments:
+            pending: List[PendingEmbedding] = []
             for attachment in attachments:
-                self.attachment_tool.process_attachment(session_id, attachment)
-        
-        # Add message to thread
-        self.client.create_message(
+                result = await asyncio.to_thread(
+                    self.attachment_tool.process_attachment, session_id, attachment
+                )
+                if result.get("success") and result.get("processed_text"):
+                    pending.append(PendingEmbedding(
+                        chunk_id=result["attachment_id"],
+                        source_id=session_id,
+                        text=result["processed_text"]
+                    ))
+            if pending:
+                await asyncio.to_thread(
+                    self.attachment_tool.flush_embeddings,
+                    pending,
+                    embedding_model=self.rag_tool.embedding_model,
+                    chroma_client=self.rag_tool.chroma_client,
+                    batch_size=settings.embedding_batch_size
+                )
+        
+        # Add message to thread; the SDK calls are synchronous network
+        # round-trips, so offload them rather than blocking the event loop
+        await asyncio.to_thread(
+            self.client.create_message,
             thread_id=thread_id,
             role="user",
             content=message
         )
-        
+
         # Run the assistant
-        run = self.client.create_run(thread_id=thread_id, assistant_id=self.assistant.id)
-        
-        # Wait for completion
+        run = await asyncio.to_thread(
+            self.client.create_run, thread_id=thread_id, assistant_id=self.assistant.id
+        )
+
+        # Wait for completion with exponential backoff, yielding the event
+        # loop instead of blocking a worker thread between polls
+        delay = 0.025
         while run.status in ["queued", "in_progress"]:
-            run = self.client.get_run(thread_id=thread_id, run_id=run.id)
-            time.sleep(0.5)
-        
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.4)
+            run = await asyncio.to_thread(
+                self.client.get_run, thread_id=thread_id, run_id=run.id
+            )
+
         # Get messages
-        messages = self.client.list_messages(thread_id=thread_id)
+        messages = await asyncio.to_thread(self.client.list_messages, thread_id=thread_id)
         assistant_message = next((m for m in messages if m.role == "assistant"), None)
         
         # Calculate execution time
@@ -2,21 +2,32 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
+import asyncio
 import os
 import uuid
 import json
 
+import aiofiles
+
 from ...db.database import get_db
 from ...agents.chat_agent import ChatAgent
 from ...core.logging import logger
 from ...core.config import settings
-from ...db.models import Session as DBSession
+from ...db.models import Session as DBSession, new_id
 from ..dependencies import get_current_user
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-# Initialize the chat agent
-chat_agent = ChatAgent()
+# Created lazily (normally from the app lifespan) so importing this module
+# does not trigger the Agent Framework network calls in ChatAgent.__init__
+chat_agent: Optional[ChatAgent] = None
+
+def get_chat_agent() -> ChatAgent:
+    """Get or create the shared chat agent instance"""
+    global chat_agent
+    if chat_agent is None:
+        chat_agent = ChatAgent()
+    return chat_agent
 
 @router.post("/sessions")
 async def create_session(
@@ -25,16 +36,14 @@ async def create_session(
 ):
     """Create a new chat session"""
     try:
-        # Generate session ID
-        session_id = str(uuid.uuid4())
-        
-        # Create session in database
-        db_session = DBSession(id=session_id, user_id=user_id)
-        db.add(db_session)
-        db.commit()
+        # Time-prefixed ids keep session inserts clustered at the right
+        # edge of the PK index; still 32 hex chars, parseable by uuid.UUID
+        session_id = new_id()
         
-        # Create thread in Agent Framework
-        thread_id = chat_agent.create_thread(session_id, user_id)
+        # Create thread in Agent Framework; the thread mapping store also
+        # creates the session row on the shared db session, so both rows
+        # commit in one transaction instead of one fsync per row
+        thread_id = get_chat_agent().create_thread(session_id, user_id, db=db)
         
         logger.info(
             f"Created new chat session {session_id}",
@@ -62,9 +71,11 @@ async def send_message(
 ):
     """Send a message to the chat agent"""
     try:
-        # Check if session exists
-        db_session = db.query(DBSession).filter(DBSession.id == session_id).first()
-        if not db_session:
+        # Check if session exists; EXISTS avoids fetching the full row
+        session_exists = db.query(
+            db.query(DBSession).filter(DBSession.id == session_id).exists()
+        ).scalar()
+        if not session_exists:
             raise HTTPException(status_code=404, detail="Session not found")
         
         # Process attachments if any
@@ -75,10 +86,12 @@ async def send_message(
             unique_filename = f"{uuid.uuid4()}{file_extension}"
             file_path = os.path.join(settings.upload_dir, unique_filename)
             
-            # Save file
-            os.makedirs(settings.upload_dir, exist_ok=True)
-            with open(file_path, "wb") as f:
-                f.write(await attachment.read())
+            # Save file in chunks without blocking the event loop; a 10MB
+            # synchronous write would stall every request on this worker
+            await asyncio.to_thread(os.makedirs, settings.upload_dir, exist_ok=True)
+            async with aiofiles.open(file_path, "wb") as f:
+                while chunk := await attachment.read(1 << 20):
+                    await f.write(chunk)
             
             # Add to processed attachments
             processed_attachments.append({
@@ -88,7 +101,7 @@ async def send_message(
             })
         
         # Send message to agent
-        response = chat_agent.send_message(
+        response = await get_chat_agent().send_message(
             session_id=session_id,
             message=message,
             attachments=processed_attachments
@@ -116,9 +129,11 @@ async def get_chat_history(
 ):
     """Get chat history for a session"""
     try:
-        # Check if session exists
-        db_session = db.query(DBSession).filter(DBSession.id == session_id).first()
-        if not db_session:
+        # Check if session exists; EXISTS avoids fetching the full row
+        session_exists = db.query(
+            db.query(DBSession).filter(DBSession.id == session_id).exists()
+        ).scalar()
+        if not session_exists:
             raise HTTPException(status_code=404, detail="Session not found")
         
         # Get messages from database
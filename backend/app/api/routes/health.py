@@ -3,6 +3,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import Dict, Any
+from functools import wraps
+import asyncio
+import sys
 import time
 
 from ...db.database import get_db
@@ -12,6 +15,50 @@ from ...metrics import update_health_check_status
 
 router = APIRouter(prefix="/health", tags=["health"])
 
+# Probes use the process-wide singletons: the Chroma open touches disk and
+# the embedding model takes seconds to load, and RAGTool shares the same
+# instances, so health checks never construct their own copies
+
+def _get_chroma_client():
+    """Get the shared Chroma client used by health checks"""
+    from ...vector_store.chroma_client import get_chroma_client
+    # Same arguments as RAGTool: the factory's lru_cache is keyed on all
+    # of them, so anything else would build a second PersistentClient on
+    # the same directory
+    return get_chroma_client(
+        settings.chroma_persist_directory,
+        embedding_model_name=settings.embedding_model_name
+    )
+
+def _get_embedding_model():
+    """Get the shared embedding model used by health checks"""
+    from ...vector_store.embeddings import get_embedding_model
+    return get_embedding_model(settings.embedding_model_name)
+
+def async_ttl_cache(ttl: float):
+    """Cache an async health check result for a short window.
+
+    Kubernetes hits these endpoints every few seconds; re-probing each
+    component on every call is wasted work, so sub-results are reused
+    until the TTL expires.
+    """
+    def decorator(func):
+        cached = {"value": None, "expires": 0.0}
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            now = time.monotonic()
+            if cached["value"] is not None and now < cached["expires"]:
+                return cached["value"]
+
+            result = await func(*args, **kwargs)
+            cached["value"] = result
+            cached["expires"] = now + ttl
+            return result
+
+        return wrapper
+    return decorator
+
 async def check_database_health(db: Session) -> Dict[str, Any]:
     """Check database connection health"""
     try:
@@ -34,6 +81,7 @@ async def check_database_health(db: Session) -> Dict[str, Any]:
             "error": str(e)
         }
 
+@async_ttl_cache(ttl=5)
 async def check_agent_framework_health() -> Dict[str, Any]:
     """Check Agent Framework connection health"""
     try:
@@ -60,14 +108,13 @@ async def check_agent_framework_health() -> Dict[str, Any]:
             "error": str(e)
         }
 
+@async_ttl_cache(ttl=5)
 async def check_chroma_health() -> Dict[str, Any]:
     """Check Chroma vector database health"""
     try:
-        from ...vector_store.chroma_client import ChromaClient
-        
         start_time = time.time()
-        chroma_client = ChromaClient(persist_directory=settings.chroma_persist_directory)
-        
+        chroma_client = _get_chroma_client()
+
         # Test a simple query
         chroma_client.get(limit=1)
         
@@ -87,14 +134,13 @@ async def check_chroma_health() -> Dict[str, Any]:
             "error": str(e)
         }
 
+@async_ttl_cache(ttl=5)
 async def check_embedding_model_health() -> Dict[str, Any]:
     """Check embedding model health"""
     try:
-        from ...vector_store.embeddings import EmbeddingModel
-        
         start_time = time.time()
-        embedding_model = EmbeddingModel(model_name=settings.embedding_model_name)
-        
+        embedding_model = _get_embedding_model()
+
         # Test embedding generation
         test_embedding = embedding_model.embed_query("test")
         
@@ -126,11 +172,14 @@ async def check_embedding_model_health() -> Dict[str, Any]:
 async def health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
     """Basic health check endpoint"""
     try:
-        # Check all components
-        db_health = await check_database_health(db)
-        agent_health = await check_agent_framework_health()
-        chroma_health = await check_chroma_health()
-        
+        # Check all components concurrently; probe latency is the slowest
+        # component instead of the sum of all of them
+        db_health, agent_health, chroma_health = await asyncio.gather(
+            check_database_health(db),
+            check_agent_framework_health(),
+            check_chroma_health()
+        )
+
         # Determine overall status
         components = {
             "database": db_health["status"],
@@ -156,11 +205,13 @@ async def health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
 async def detailed_health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
     """Detailed health check endpoint with more information"""
     try:
-        # Check all components with detailed information
-        db_health = await check_database_health(db)
-        agent_health = await check_agent_framework_health()
-        chroma_health = await check_chroma_health()
-        embedding_health = await check_embedding_model_health()
+        # Check all components with detailed information, in parallel
+        db_health, agent_health, chroma_health, embedding_health = await asyncio.gather(
+            check_database_health(db),
+            check_agent_framework_health(),
+            check_chroma_health(),
+            check_embedding_model_health()
+        )
         
         # Determine overall status
         components = {
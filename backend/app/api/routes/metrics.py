@@ -1,12 +1,32 @@
 # backend/app/api/routes/metrics.py
+import asyncio
+import os
+
 from fastapi import APIRouter, Response
-from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
 
 from ...metrics import metrics_registry
 
 router = APIRouter(prefix="/metrics", tags=["metrics"])
 
+def _scrape_registry() -> CollectorRegistry:
+    """Build the registry to scrape.
+
+    When PROMETHEUS_MULTIPROC_DIR is set (multi-worker deploys), aggregate the
+    file-backed metrics from every worker; otherwise use the in-process
+    registry directly.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return metrics_registry
+
 @router.get("/")
 async def metrics():
     """Prometheus metrics endpoint"""
-    return Response(generate_latest(metrics_registry), media_type=CONTENT_TYPE_LATEST)
+    # Serialization can take tens of ms under scrape storms; run it off the
+    # event loop so chat requests on this worker are not stalled
+    payload = await asyncio.to_thread(generate_latest, _scrape_registry())
+    return Response(payload, media_type=CONTENT_TYPE_LATEST)
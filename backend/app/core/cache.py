@@ -1,35 +1,91 @@
 # backend/app/core/cache.py
 import redis
+import functools
+import inspect
 import json
 import pickle
-from typing import Any, Optional, Union
+import time
+import orjson
+import xxhash
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
+from typing import Any, List, Optional, Union
 from datetime import timedelta
 from .config import settings
 from .logging import logger
 
-class CacheManager:
-    """Redis-based cache manager"""
-    
-    def __init__(self):
-        self.redis_client = redis.Redis(
+# Process-wide connection pool shared by every CacheManager instance; caps
+# file descriptors under load and avoids per-instance TCP handshakes
+_redis_pool: Optional[redis.ConnectionPool] = None
+
+def _get_redis_pool() -> redis.ConnectionPool:
+    """Get or create the shared Redis connection pool"""
+    global _redis_pool
+    if _redis_pool is None:
+        _redis_pool = redis.ConnectionPool(
             host=settings.redis_host,
             port=settings.redis_port,
             password=settings.redis_password,
             db=0,
-            decode_responses=False
+            decode_responses=False,
+            max_connections=64,
+            socket_keepalive=True,
+            health_check_interval=30,
+            retry=Retry(ExponentialBackoff(), 3),
+            retry_on_error=[redis.ConnectionError]
         )
-        
-        # Test connection
+    return _redis_pool
+
+class CacheManager:
+    """Redis-based cache manager"""
+
+    # How long a failed probe keeps the early-exit guards short-circuiting
+    # before is_available() tries Redis again
+    _PROBE_INTERVAL = 30.0
+
+    def __init__(self):
+        self.redis_client = redis.Redis(connection_pool=_get_redis_pool())
+
+        # Probe once at startup; the availability flag gates every cache
+        # call's early exit so a down Redis costs one cheap check per call
+        # instead of a full retrying connect cycle
+        self._available = False
+        self._last_probe = time.monotonic()
         try:
             self.redis_client.ping()
+            self._available = True
             logger.info("Redis connection established")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {str(e)}")
-            self.redis_client = None
-    
+
+    def _mark_unavailable(self, exc: Exception) -> None:
+        """Drop the availability flag when an operation loses the connection.
+
+        Subsequent calls then short-circuit in is_available() instead of
+        each paying the full retrying connect cycle, until a re-probe
+        brings the flag back up.
+        """
+        if isinstance(exc, (redis.ConnectionError, redis.TimeoutError)):
+            self._available = False
+            self._last_probe = time.monotonic()
+
     def is_available(self) -> bool:
-        """Check if Redis is available"""
-        return self.redis_client is not None
+        """Check if Redis is available, re-probing periodically when down"""
+        if self._available:
+            return True
+
+        now = time.monotonic()
+        if now - self._last_probe < self._PROBE_INTERVAL:
+            return False
+
+        self._last_probe = now
+        try:
+            self.redis_client.ping()
+            self._available = True
+            logger.info("Redis connection re-established")
+            return True
+        except Exception:
+            return False
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set a value in cache"""
@@ -37,9 +93,16 @@ class CacheManager:
             return False
         
         try:
-            # Serialize value
-            serialized_value = pickle.dumps(value)
-            
+            # Serialize value: orjson for the common dict/list case (faster
+            # and smaller than pickle), with a one-byte tag so get() can
+            # dispatch; pickle only for values JSON can't represent
+            try:
+                serialized_value = b"J" + orjson.dumps(
+                    value, option=orjson.OPT_SERIALIZE_NUMPY
+                )
+            except TypeError:
+                serialized_value = b"P" + pickle.dumps(value)
+
             # Set with TTL if provided
             if ttl:
                 return self.redis_client.setex(key, ttl, serialized_value)
@@ -47,6 +110,7 @@ class CacheManager:
                 return self.redis_client.set(key, serialized_value)
         except Exception as e:
             logger.error(f"Failed to set cache key {key}: {str(e)}")
+            self._mark_unavailable(e)
             return False
     
     def get(self, key: str) -> Optional[Any]:
@@ -57,10 +121,16 @@ class CacheManager:
         try:
             value = self.redis_client.get(key)
             if value:
+                if value[:1] == b"J":
+                    return orjson.loads(value[1:])
+                if value[:1] == b"P":
+                    return pickle.loads(value[1:])
+                # Legacy entries written before the type tag was introduced
                 return pickle.loads(value)
             return None
         except Exception as e:
             logger.error(f"Failed to get cache key {key}: {str(e)}")
+            self._mark_unavailable(e)
             return None
     
     def delete(self, key: str) -> bool:
@@ -72,6 +142,7 @@ class CacheManager:
             return bool(self.redis_client.delete(key))
         except Exception as e:
             logger.error(f"Failed to delete cache key {key}: {str(e)}")
+            self._mark_unavailable(e)
             return False
     
     def exists(self, key: str) -> bool:
@@ -83,41 +154,127 @@ class CacheManager:
             return bool(self.redis_client.exists(key))
         except Exception as e:
             logger.error(f"Failed to check cache key {key}: {str(e)}")
+            self._mark_unavailable(e)
             return False
     
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get multiple values from cache in a single round-trip"""
+        if not keys or not self.is_available():
+            return [None] * len(keys)
+
+        try:
+            values = self.redis_client.mget(keys)
+            results = []
+            for value in values:
+                if value is None:
+                    results.append(None)
+                elif value[:1] == b"J":
+                    results.append(orjson.loads(value[1:]))
+                elif value[:1] == b"P":
+                    results.append(pickle.loads(value[1:]))
+                else:
+                    results.append(pickle.loads(value))
+            return results
+        except Exception as e:
+            logger.error(f"Failed to get cache keys: {str(e)}")
+            self._mark_unavailable(e)
+            return [None] * len(keys)
+
+    def incr(self, key: str) -> int:
+        """Atomically increment a plain integer counter key"""
+        if not self.is_available():
+            return 0
+
+        try:
+            return int(self.redis_client.incr(key))
+        except Exception as e:
+            logger.error(f"Failed to increment cache key {key}: {str(e)}")
+            self._mark_unavailable(e)
+            return 0
+
+    def get_counter(self, key: str) -> int:
+        """Read a plain integer counter key (0 when missing)"""
+        if not self.is_available():
+            return 0
+
+        try:
+            value = self.redis_client.get(key)
+            return int(value) if value is not None else 0
+        except Exception as e:
+            logger.error(f"Failed to read cache counter {key}: {str(e)}")
+            self._mark_unavailable(e)
+            return 0
+
     def clear_pattern(self, pattern: str) -> int:
         """Clear keys matching a pattern"""
         if not self.is_available():
             return 0
-        
+
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
-            return 0
+            # SCAN streams matching keys incrementally instead of KEYS, which
+            # blocks Redis for the whole keyspace; deletes go through a
+            # pipeline in chunks to amortize round-trips
+            pipe = self.redis_client.pipeline(transaction=False)
+            batch = []
+            for key in self.redis_client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    pipe.delete(*batch)
+                    batch.clear()
+            if batch:
+                pipe.delete(*batch)
+            return sum(pipe.execute())
         except Exception as e:
             logger.error(f"Failed to clear cache pattern {pattern}: {str(e)}")
+            self._mark_unavailable(e)
             return 0
 
 # Global cache manager instance
 cache_manager = CacheManager()
 
+def _make_cache_key(key_prefix: str, args: tuple, kwargs: dict) -> str:
+    """Build a deterministic cache key from the call arguments.
+
+    Built-in hash() is randomized per process, so keys derived from it never
+    match across workers; hashing a sort-keyed JSON encoding gives stable
+    cross-worker keys.
+    """
+    key_bytes = orjson.dumps(
+        [args, kwargs], option=orjson.OPT_SORT_KEYS, default=str
+    )
+    return f"{key_prefix}:{xxhash.xxh3_64_hexdigest(key_bytes)}"
+
 def cache_result(key_prefix: str, ttl: int = 300):
     """Decorator to cache function results"""
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_key = _make_cache_key(key_prefix, args, kwargs)
+
+                cached_result = cache_manager.get(cache_key)
+                if cached_result is not None:
+                    return cached_result
+
+                result = await func(*args, **kwargs)
+                cache_manager.set(cache_key, result, ttl)
+
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Generate cache key
-            cache_key = f"{key_prefix}:{hash(str(args) + str(kwargs))}"
-            
+            cache_key = _make_cache_key(key_prefix, args, kwargs)
+
             # Try to get from cache
             cached_result = cache_manager.get(cache_key)
             if cached_result is not None:
                 return cached_result
-            
+
             # Execute function and cache result
             result = func(*args, **kwargs)
             cache_manager.set(cache_key, result, ttl)
-            
+
             return result
         return wrapper
     return decorator
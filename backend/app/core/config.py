@@ -1,8 +1,11 @@
 # backend/app/core/config.py
-from pydantic import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", frozen=True)
+
     # Application settings
     app_name: str = "Customer Support Agent"
     app_version: str = "1.0.0"
@@ -10,23 +13,43 @@ class Settings(BaseSettings):
     
     # Database settings
     database_url: str = "sqlite:///./customer_support.db"
+    auto_create_tables: bool = False  # dev-only; schema is owned by Alembic
     
     # Agent Framework settings
     agent_framework_endpoint: Optional[str] = None
     agent_framework_api_key: Optional[str] = None
     
+    # Redis settings
+    redis_host: str = "localhost"
+    redis_port: int = 6379
+    redis_password: Optional[str] = None
+
     # Vector store settings
     chroma_persist_directory: str = "./chroma_db"
     embedding_model_name: str = "google/embeddinggemma-300m"
+    embedding_onnx_dir: Optional[str] = None  # from scripts/quantize_embedding_model.py
+    embedding_batch_size: int = 16
+    rag_similarity_threshold: float = 0.97
+    chroma_hnsw_m: int = 32
+    chroma_hnsw_construction_ef: int = 200
+    chroma_hnsw_search_ef: int = 64
     
     # Security settings
     secret_key: str = "change-me-in-production"
     session_timeout: int = 3600  # 1 hour
+    token_cache_maxsize: int = 10000
+    token_cache_ttl: int = 30  # seconds
+    bcrypt_rounds: int = 12
     
+    # Attachment settings
+    upload_dir: str = "./uploads"
+
     # Logging settings
     log_level: str = "INFO"
     
-    class Config:
-        env_file = ".env"
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the settings once; env parsing is not free, so reuse the instance"""
+    return Settings()
 
-settings = Settings()
+settings = get_settings()
@@ -1,10 +1,10 @@
 # backend/app/db/database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from sqlalchemy.pool import QueuePool
 from .models import Base
-from .core.config import settings
-from .core.logging import logger
+from ..core.config import settings
+from ..core.logging import logger
 
 # Create database engine with connection pooling
 engine = create_engine(
@@ -14,12 +14,44 @@ engine = create_engine(
     max_overflow=30,
     pool_pre_ping=True,
     pool_recycle=3600,
+    # Bulk inserts (session.execute(insert(Model), rows)) batch this many
+    # rows per statement on dialects with insertmanyvalues support
+    insertmanyvalues_page_size=1000,
     echo=settings.debug
 )
 
+if engine.url.get_backend_name() == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Apply SQLite tuning PRAGMAs on every new pooled connection.
+
+        WAL with synchronous=NORMAL moves fsyncs from per-commit to
+        per-checkpoint and lets readers run alongside the writer; the
+        memory/mmap settings keep the page cache and temp tables off disk.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Thread-local session registry for the tools' hot paths: one Session
+# object per thread, reset (not reconstructed) after each use;
+# expire_on_commit=False keeps returned rows readable after commit
+ScopedSession = scoped_session(
+    sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=engine,
+        expire_on_commit=False
+    )
+)
+
 def get_db() -> Session:
     """Dependency to get database session"""
     db = SessionLocal()
@@ -1,20 +1,30 @@
 # backend/app/db/models.py
-from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
-import uuid
+import secrets
+import time
 
 Base = declarative_base()
 
+def new_id() -> str:
+    """Generate a time-prefixed row id (ULID-style ordering, hex string).
+
+    Random UUIDs scatter inserts across the whole primary-key B-tree; a
+    monotonic timestamp prefix keeps new rows appending to the right-hand
+    index pages instead.
+    """
+    return f"{time.time_ns():016x}{secrets.token_hex(8)}"
+
 class Session(Base):
     __tablename__ = "sessions"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, nullable=True)  # Optional user identification
+    id = Column(String, primary_key=True, default=new_id)
+    user_id = Column(String, nullable=True, index=True)  # Optional user identification
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    is_active = Column(Boolean, default=True)
+    is_active = Column(Boolean, default=True, index=True)
     
     # Relationships
     messages = relationship("Message", back_populates="session")
@@ -22,8 +32,12 @@ class Session(Base):
 
 class Message(Base):
     __tablename__ = "messages"
-    
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    __table_args__ = (
+        # Covers the history query: filter by session, order by timestamp
+        Index("ix_messages_session_ts", "session_id", "timestamp"),
+    )
+
+    id = Column(String, primary_key=True, default=new_id)
     session_id = Column(String, ForeignKey("sessions.id"))
     content = Column(Text, nullable=False)
     role = Column(String, nullable=False)  # "user" or "assistant"
@@ -34,8 +48,14 @@ class Message(Base):
 
 class MemoryEntry(Base):
     __tablename__ = "memory_entries"
-    
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    __table_args__ = (
+        # Covers memory lookups: filter by session, match a specific key.
+        # Unique so stores are upserts — one row per (session, key) keeps
+        # the table O(sessions) instead of O(turns)
+        Index("ix_memory_session_key", "session_id", "key", unique=True),
+    )
+
+    id = Column(String, primary_key=True, default=new_id)
     session_id = Column(String, ForeignKey("sessions.id"))
     key = Column(String, nullable=False)
     value = Column(Text, nullable=False)
@@ -44,13 +64,23 @@ class MemoryEntry(Base):
     # Relationships
     session = relationship("Session", back_populates="memory_entries")
 
+class ProcessedAttachmentCache(Base):
+    __tablename__ = "processed_attachment_cache"
+
+    # xxh3 of the file bytes; identical uploads share one conversion
+    content_hash = Column(String, primary_key=True)
+    processed_text = deferred(Column(Text, nullable=False))
+    timestamp = Column(DateTime, default=datetime.utcnow)
+
 class Attachment(Base):
     __tablename__ = "attachments"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=new_id)
     session_id = Column(String, ForeignKey("sessions.id"))
     filename = Column(String, nullable=False)
     content_type = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
-    processed_text = Column(Text, nullable=True)
+    # Deferred: converted documents can run to megabytes, and most
+    # attachment queries only need the row metadata
+    processed_text = deferred(Column(Text, nullable=True))
     timestamp = Column(DateTime, default=datetime.utcnow)
@@ -1,29 +1,59 @@
 # backend/app/main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+import logging
+import secrets
 import time
-import uuid
 
 from .core.config import settings
 from .core.logging import logger, setup_logging
 from .api.routes import chat, health, metrics
 from .metrics import set_active_sessions
-from .db.database import engine
-from .db.models import Base
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 # Setup logging
 setup_logging()
 
+# Lifespan context
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info(
+        f"Starting {settings.app_name} v{settings.app_version}",
+        extra={"event": "startup"}
+    )
+
+    # Schema is managed by scripts/init_db.py and Alembic; creating tables
+    # at import time costs a DDL round-trip per table in every worker.
+    # Dev convenience only, opt-in via settings.
+    if settings.debug and settings.auto_create_tables:
+        from .db.database import init_db
+        init_db()
+
+    # Build the chat agent once at startup instead of at module import,
+    # so worker boot does not block on Agent Framework network calls
+    app.state.chat_agent = chat.get_chat_agent()
+
+    yield
+
+    logger.info(
+        f"Shutting down {settings.app_name}",
+        extra={"event": "shutdown"}
+    )
+
+    # Drain the agent's pooled HTTP connections on the way out
+    app.state.chat_agent.close()
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="Customer Support AI Agent API",
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan,
+    # orjson serializes response bodies in C; chat/RAG payloads are
+    # JSON-heavy, so this applies to every endpoint at once
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -35,36 +65,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add request ID middleware
+# Request ID + access logging in one middleware: each @app.middleware
+# layer adds its own coroutine frame and await boundary per request
 @app.middleware("http")
-async def add_request_id(request: Request, call_next):
-    request_id = str(uuid.uuid4())
+async def observability_middleware(request: Request, call_next):
+    # Opaque to clients, so skip UUID object construction/formatting;
+    # token_hex is a single urandom read plus hex encode
+    request_id = secrets.token_hex(16)
     request.state.request_id = request_id
-    
-    response = await call_next(request)
-    response.headers["X-Request-ID"] = request_id
-    return response
 
-# Add logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
     start_time = time.time()
-    
     response = await call_next(request)
-    
     process_time = time.time() - start_time
-    
-    logger.info(
-        f"{request.method} {request.url.path} - {response.status_code}",
-        extra={
-            "method": request.method,
-            "path": request.url.path,
-            "status_code": response.status_code,
-            "process_time": process_time,
-            "request_id": getattr(request.state, "request_id", None)
-        }
-    )
-    
+
+    response.headers["X-Request-ID"] = request_id
+
+    # Lazy %s formatting so the message is only built when INFO is
+    # emitted; URL.path is computed per access, so read it once
+    if logger.isEnabledFor(logging.INFO):
+        path = request.url.path
+        logger.info(
+            "%s %s - %s",
+            request.method,
+            path,
+            response.status_code,
+            extra={
+                "method": request.method,
+                "path": path,
+                "status_code": response.status_code,
+                "process_time": process_time,
+                "request_id": request_id
+            }
+        )
+
     return response
 
 # Include routers
@@ -85,32 +118,19 @@ async def global_exception_handler(request: Request, exc):
         exc_info=True
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error"}
     )
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    logger.info(
-        f"Starting {settings.app_name} v{settings.app_version}",
-        extra={"event": "startup"}
-    )
-
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info(
-        f"Shutting down {settings.app_name}",
-        extra={"event": "shutdown"}
-    )
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.debug
+        reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=30
     )
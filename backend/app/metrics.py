@@ -2,23 +2,26 @@
 from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, generate_latest
 from typing import Dict, Any, Optional
 import time
-from functools import wraps
+from functools import lru_cache, wraps
 
 # Create a custom registry
 metrics_registry = CollectorRegistry()
 
-# Define metrics
+# Define metrics. Label sets are kept to low-cardinality, aggregatable
+# dimensions only — a session_id label would create a new child (and, for
+# histograms, a full bucket set) per session, growing the scrape payload
+# without bound. Per-session detail lives in the structured logs instead.
 message_counter = Counter(
     "chat_messages_total",
     "Total number of chat messages",
-    ["session_id", "role", "status"],
+    ["role", "status"],
     registry=metrics_registry
 )
 
 message_duration = Histogram(
     "chat_message_duration_seconds",
     "Time spent processing chat messages",
-    ["session_id", "status"],
+    ["status"],
     buckets=[0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0],
     registry=metrics_registry
 )
@@ -26,21 +29,21 @@ message_duration = Histogram(
 escalation_counter = Counter(
     "chat_escalations_total",
     "Total number of escalations to human agents",
-    ["session_id", "reason"],
+    ["reason"],
     registry=metrics_registry
 )
 
 rag_queries = Counter(
     "rag_queries_total",
     "Total number of RAG queries",
-    ["session_id", "status"],
+    ["status"],
     registry=metrics_registry
 )
 
 rag_query_duration = Histogram(
     "rag_query_duration_seconds",
     "Time spent processing RAG queries",
-    ["session_id", "status"],
+    ["status"],
     buckets=[0.1, 0.5, 1.0, 2.0, 5.0, 10.0],
     registry=metrics_registry
 )
@@ -48,14 +51,14 @@ rag_query_duration = Histogram(
 attachment_processing = Counter(
     "attachment_processing_total",
     "Total number of attachments processed",
-    ["session_id", "content_type", "status"],
+    ["content_type", "status"],
     registry=metrics_registry
 )
 
 attachment_processing_duration = Histogram(
     "attachment_processing_duration_seconds",
     "Time spent processing attachments",
-    ["session_id", "content_type", "status"],
+    ["content_type", "status"],
     buckets=[0.5, 1.0, 2.0, 5.0, 10.0, 30.0],
     registry=metrics_registry
 )
@@ -80,6 +83,28 @@ health_check_status = Gauge(
     registry=metrics_registry
 )
 
+# Precomputed label children. .labels() hashes the label tuple and takes a
+# lock on every call; the fixed (role, status) combinations are known at
+# import, so resolve each child once and call .inc()/.observe() directly.
+_MSG_ASSISTANT_OK = message_counter.labels(role="assistant", status="success")
+_MSG_DURATION = {
+    "success": message_duration.labels(status="success"),
+    "error": message_duration.labels(status="error"),
+}
+_RAG_OK = rag_queries.labels(status="success")
+_RAG_DURATION = {
+    "success": rag_query_duration.labels(status="success"),
+    "error": rag_query_duration.labels(status="error"),
+}
+
+@lru_cache(maxsize=64)
+def _attachment_children(content_type: str, status: str):
+    """Resolve (counter, histogram) children once per content type"""
+    return (
+        attachment_processing.labels(content_type=content_type, status=status),
+        attachment_processing_duration.labels(content_type=content_type, status=status),
+    )
+
 # Decorators for automatic metrics collection
 def track_message_metrics(func):
     """Decorator to track message processing metrics"""
@@ -87,17 +112,13 @@ def track_message_metrics(func):
     def wrapper(self, session_id: str, *args, **kwargs):
         start_time = time.time()
         status = "success"
-        
+
         try:
             result = func(self, session_id, *args, **kwargs)
-            
+
             # Track successful message
-            message_counter.labels(
-                session_id=session_id,
-                role="assistant",
-                status="success"
-            ).inc()
-            
+            _MSG_ASSISTANT_OK.inc()
+
             return result
         except Exception as e:
             status = "error"
@@ -109,30 +130,23 @@ def track_message_metrics(func):
         finally:
             # Track duration
             duration = time.time() - start_time
-            message_duration.labels(
-                session_id=session_id,
-                status=status
-            ).observe(duration)
-    
+            _MSG_DURATION[status].observe(duration)
+
     return wrapper
 
 def track_rag_metrics(func):
     """Decorator to track RAG query metrics"""
     @wraps(func)
     def wrapper(self, parameters: Dict[str, Any], *args, **kwargs):
-        session_id = parameters.get("session_id", "unknown")
         start_time = time.time()
         status = "success"
-        
+
         try:
             result = func(self, parameters, *args, **kwargs)
-            
+
             # Track successful RAG query
-            rag_queries.labels(
-                session_id=session_id,
-                status="success"
-            ).inc()
-            
+            _RAG_OK.inc()
+
             return result
         except Exception as e:
             status = "error"
@@ -144,32 +158,24 @@ def track_rag_metrics(func):
         finally:
             # Track duration
             duration = time.time() - start_time
-            rag_query_duration.labels(
-                session_id=session_id,
-                status=status
-            ).observe(duration)
-    
+            _RAG_DURATION[status].observe(duration)
+
     return wrapper
 
 def track_attachment_metrics(func):
     """Decorator to track attachment processing metrics"""
     @wraps(func)
     def wrapper(self, parameters: Dict[str, Any], *args, **kwargs):
-        session_id = parameters.get("session_id", "unknown")
         content_type = parameters.get("content_type", "unknown")
         start_time = time.time()
         status = "success"
-        
+
         try:
             result = func(self, parameters, *args, **kwargs)
-            
+
             # Track successful attachment processing
-            attachment_processing.labels(
-                session_id=session_id,
-                content_type=content_type,
-                status="success"
-            ).inc()
-            
+            _attachment_children(content_type, "success")[0].inc()
+
             return result
         except Exception as e:
             status = "error"
@@ -181,42 +187,40 @@ def track_attachment_metrics(func):
         finally:
             # Track duration
             duration = time.time() - start_time
-            attachment_processing_duration.labels(
-                session_id=session_id,
-                content_type=content_type,
-                status=status
-            ).observe(duration)
-    
+            _attachment_children(content_type, status)[1].observe(duration)
+
     return wrapper
 
 # Helper functions
-def increment_message_counter(session_id: str, role: str, status: str = "success"):
+def increment_message_counter(role: str, status: str = "success"):
     """Increment the message counter"""
-    message_counter.labels(session_id=session_id, role=role, status=status).inc()
+    message_counter.labels(role=role, status=status).inc()
 
-def observe_message_duration(session_id: str, duration: float, status: str = "success"):
+def observe_message_duration(duration: float, status: str = "success"):
     """Observe message processing duration"""
-    message_duration.labels(session_id=session_id, status=status).observe(duration)
+    child = _MSG_DURATION.get(status) or message_duration.labels(status=status)
+    child.observe(duration)
 
-def increment_escalation_counter(session_id: str, reason: str):
+def increment_escalation_counter(reason: str):
     """Increment the escalation counter"""
-    escalation_counter.labels(session_id=session_id, reason=reason).inc()
+    escalation_counter.labels(reason=reason).inc()
 
-def increment_rag_queries(session_id: str, status: str = "success"):
+def increment_rag_queries(status: str = "success"):
     """Increment the RAG queries counter"""
-    rag_queries.labels(session_id=session_id, status=status).inc()
+    rag_queries.labels(status=status).inc()
 
-def observe_rag_query_duration(session_id: str, duration: float, status: str = "success"):
+def observe_rag_query_duration(duration: float, status: str = "success"):
     """Observe RAG query processing duration"""
-    rag_query_duration.labels(session_id=session_id, status=status).observe(duration)
+    child = _RAG_DURATION.get(status) or rag_query_duration.labels(status=status)
+    child.observe(duration)
 
-def increment_attachment_processing(session_id: str, content_type: str, status: str = "success"):
+def increment_attachment_processing(content_type: str, status: str = "success"):
     """Increment the attachment processing counter"""
-    attachment_processing.labels(session_id=session_id, content_type=content_type, status=status).inc()
+    _attachment_children(content_type, status)[0].inc()
 
-def observe_attachment_processing_duration(session_id: str, content_type: str, duration: float, status: str = "success"):
+def observe_attachment_processing_duration(content_type: str, duration: float, status: str = "success"):
     """Observe attachment processing duration"""
-    attachment_processing_duration.labels(session_id=session_id, content_type=content_type, status=status).observe(duration)
+    _attachment_children(content_type, status)[1].observe(duration)
 
 def set_active_sessions(count: int):
     """Set the number of active sessions"""
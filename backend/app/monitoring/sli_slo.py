@@ -1,5 +1,7 @@
 # backend/app/monitoring/sli_slo.py
 import time
+import numpy as np
+from collections import defaultdict, deque
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass
@@ -30,7 +32,9 @@ class SLIMonitor:
     def __init__(self):
         self.slis: Dict[str, SLIDefinition] = {}
         self.slos: Dict[str, SLODefinition] = {}
-        self.sli_values: Dict[str, List[float]] = {}
+        # Ring buffers of (timestamp, value); maxlen covers 24h at one
+        # sample per second and evicts the oldest entry in C
+        self.sli_values: Dict[str, deque] = defaultdict(lambda: deque(maxlen=86400))
         
         # Initialize SLIs
         self._initialize_slis()
@@ -102,51 +106,44 @@ class SLIMonitor:
     
     def record_sli_value(self, sli_name: str, value: float):
         """Record a new SLI value"""
-        if sli_name not in self.sli_values:
-            self.sli_values[sli_name] = []
-        
-        self.sli_values[sli_name].append({
-            "value": value,
-            "timestamp": datetime.utcnow()
-        })
-        
-        # Keep only values within the last 24 hours
-        cutoff_time = datetime.utcnow() - timedelta(hours=24)
-        self.sli_values[sli_name] = [
-            entry for entry in self.sli_values[sli_name]
-            if entry["timestamp"] > cutoff_time
-        ]
-    
+        # O(1) append; the old append-then-rebuild filter copied the whole
+        # list on every record. The maxlen bounds memory, and staleness is
+        # enforced by the cutoff filter at read time.
+        self.sli_values[sli_name].append((time.time(), value))
+
     def calculate_sli_compliance(self, sli_name: str, time_window: timedelta) -> float:
         """Calculate SLI compliance over a time window"""
-        if sli_name not in self.sli_values:
+        values = self.sli_values.get(sli_name)
+        if not values:
             return 0.0
-        
-        cutoff_time = datetime.utcnow() - time_window
-        recent_values = [
-            entry["value"] for entry in self.sli_values[sli_name]
-            if entry["timestamp"] > cutoff_time
-        ]
-        
-        if not recent_values:
+
+        # One vectorized pass over the window instead of per-value Python
+        # comprehensions; deque entries are timestamp-ordered, so values are
+        # filtered once and the math runs as C loops over the array
+        cutoff = time.time() - time_window.total_seconds()
+        recent = np.fromiter(
+            (value for ts, value in values if ts > cutoff),
+            dtype=np.float64
+        )
+
+        if recent.size == 0:
             return 0.0
-        
+
         # Calculate compliance based on SLI type
         if sli_name == "response_time":
             # For response time, calculate percentage of values under target
             target = 2.0  # 2 seconds
-            compliant_values = [v for v in recent_values if v <= target]
-            return (len(compliant_values) / len(recent_values)) * 100
+            return float((recent <= target).mean() * 100.0)
         elif sli_name == "error_rate":
             # For error rate, calculate average
-            return 100 - sum(recent_values) / len(recent_values)
+            return float(100.0 - recent.mean())
         elif sli_name == "availability":
             # For availability, calculate average
-            return sum(recent_values) / len(recent_values)
+            return float(recent.mean())
         elif sli_name == "rag_relevance":
             # For RAG relevance, calculate average
-            return sum(recent_values) / len(recent_values)
-        
+            return float(recent.mean())
+
         return 0.0
     
     def check_slo_compliance(self) -> Dict[str, Dict[str, Any]]:
@@ -1,14 +1,24 @@
 # backend/app/tools/attachment_tool.py
 from typing import Dict, Any, List, Optional
+from dataclasses import dataclass
 import os
-import uuid
+import xxhash
 from markitdown import markitdown
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from ..db.database import get_db
-from ..db.models import Attachment
+from ..db.database import ScopedSession
+from ..db.models import Attachment, ProcessedAttachmentCache, new_id
+from ..core.cache import cache_manager
 from ..core.logging import logger
 from ..core.config import settings
 
+@dataclass
+class PendingEmbedding:
+    """A chunk of attachment text queued for batched embedding"""
+    chunk_id: str
+    source_id: str
+    text: str
+
 class AttachmentTool:
     """Tool for processing user attachments"""
     
@@ -23,6 +33,15 @@ class AttachmentTool:
         else:
             return {"error": f"Unknown action: {action}"}
     
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        """xxh3 of the file contents, read in 1MB chunks"""
+        hasher = xxhash.xxh3_64()
+        with open(file_path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
     def _process_attachment(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Process an uploaded attachment"""
         session_id = parameters.get("session_id")
@@ -34,24 +53,44 @@ class AttachmentTool:
             return {"error": "Missing required parameters"}
         
         try:
-            # Generate unique ID for the attachment
-            attachment_id = str(uuid.uuid4())
-            
-            # Process the attachment with markitdown
-            processed_text = markitdown.convert(file_path)
-            
-            # Store attachment info in database
-            db = next(get_db())
-            attachment = Attachment(
-                id=attachment_id,
-                session_id=session_id,
-                filename=filename,
-                content_type=content_type,
-                file_path=file_path,
-                processed_text=processed_text
-            )
-            db.add(attachment)
-            db.commit()
+            # Generate unique ID for the attachment (time-prefixed, keeps
+            # the PK index appending at the right edge)
+            attachment_id = new_id()
+
+            # Identical bytes convert to identical text, so look up the
+            # file's content hash before paying for a conversion — first
+            # in Redis (cross-process), then in the durable cache table
+            content_hash = self._hash_file(file_path)
+            cache_key = f"attachment_text:{content_hash}"
+            processed_text = cache_manager.get(cache_key)
+
+            with ScopedSession() as db:
+                if processed_text is None:
+                    cached = db.get(ProcessedAttachmentCache, content_hash)
+                    if cached is not None:
+                        processed_text = cached.processed_text
+
+                if processed_text is None:
+                    # Process the attachment with markitdown
+                    processed_text = markitdown.convert(file_path)
+                    db.merge(ProcessedAttachmentCache(
+                        content_hash=content_hash,
+                        processed_text=processed_text
+                    ))
+
+                # Store attachment info in database
+                attachment = Attachment(
+                    id=attachment_id,
+                    session_id=session_id,
+                    filename=filename,
+                    content_type=content_type,
+                    file_path=file_path,
+                    processed_text=processed_text
+                )
+                db.add(attachment)
+                db.commit()
+
+            cache_manager.set(cache_key, processed_text, ttl=3600)
             
             logger.info(
                 f"Processed attachment {filename} for session {session_id}",
@@ -78,8 +117,6 @@ class AttachmentTool:
                 }
             )
             return {"error": f"Failed to process attachment: {str(e)}"}
-        finally:
-            db.close()
     
     def _get_attachment_text(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Get processed text for an attachment"""
@@ -89,16 +126,21 @@ class AttachmentTool:
             return {"error": "Attachment ID is required"}
         
         try:
-            db = next(get_db())
-            attachment = db.query(Attachment).filter(Attachment.id == attachment_id).first()
-            
-            if not attachment:
+            # Select the columns explicitly: processed_text is deferred on
+            # the model, so this is the one query that should load it
+            with ScopedSession() as db:
+                row = db.execute(
+                    select(Attachment.filename, Attachment.processed_text)
+                    .where(Attachment.id == attachment_id)
+                ).first()
+
+            if not row:
                 return {"error": "Attachment not found"}
-            
+
             return {
                 "attachment_id": attachment_id,
-                "filename": attachment.filename,
-                "processed_text": attachment.processed_text
+                "filename": row.filename,
+                "processed_text": row.processed_text
             }
         except Exception as e:
             logger.error(
@@ -106,9 +148,48 @@ class AttachmentTool:
                 extra={"tool_name": "attachment_tool", "attachment_id": attachment_id}
             )
             return {"error": f"Failed to get attachment text: {str(e)}"}
-        finally:
-            db.close()
     
+    def flush_embeddings(
+        self,
+        pending: List[PendingEmbedding],
+        embedding_model,
+        chroma_client,
+        batch_size: int = 16
+    ) -> int:
+        """Embed queued attachment chunks in batches and bulk-add them to Chroma.
+
+        Embedding one chunk per call costs one backend round-trip each; slicing
+        the queue into windows amortizes that to one call per batch.
+        """
+        embedded = 0
+
+        for start in range(0, len(pending), batch_size):
+            window = pending[start:start + batch_size]
+
+            try:
+                texts = [entry.text for entry in window]
+                embeddings = embedding_model.embed_documents(texts)
+
+                chroma_client.add(
+                    documents=texts,
+                    embeddings=embeddings,
+                    metadatas=[{"source_id": entry.source_id} for entry in window],
+                    ids=[entry.chunk_id for entry in window]
+                )
+                embedded += len(window)
+            except Exception as e:
+                logger.error(
+                    f"Failed to flush embedding batch: {str(e)}",
+                    extra={"tool_name": "attachment_tool"}
+                )
+
+        logger.info(
+            f"Flushed {embedded} attachment chunks to vector store",
+            extra={"tool_name": "attachment_tool", "attachment_count": embedded}
+        )
+
+        return embedded
+
     # Convenience method for the ChatAgent class
     def process_attachment(self, session_id: str, attachment: Dict[str, Any]) -> Dict[str, Any]:
         """Process an attachment from the ChatAgent"""
@@ -1,8 +1,7 @@
 # backend/app/tools/escalation_tool.py
 from typing import Dict, Any
-import uuid
-from datetime import datetime
 from ..core.logging import logger
+from ..db.models import new_id
 
 class EscalationTool:
     """Tool for escalating conversations to human agents"""
@@ -18,8 +17,9 @@ class EscalationTool:
             return {"error": "Session ID and reason are required"}
         
         try:
-            # Generate a ticket ID
-            ticket_id = str(uuid.uuid4())
+            # Generate a ticket ID: time-prefixed like the row ids, so
+            # tickets sort chronologically and skip uuid4's object churn
+            ticket_id = new_id()
             
             # In a real implementation, this would create a ticket in a ticketing system
             # For now, we'll just log the escalation
@@ -30,8 +30,7 @@ class EscalationTool:
                     "user_id": user_id,
                     "tool_name": "escalation_tool",
                     "ticket_id": ticket_id,
-                    "reason": reason,
-                    "timestamp": datetime.utcnow().isoformat()
+                    "reason": reason
                 }
             )
             
@@ -1,10 +1,31 @@
 # backend/app/tools/memory_tool.py
 from typing import Dict, Any, Optional, List
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from ..db.database import get_db
-from ..db.models import MemoryEntry, Session
+from ..db.database import ScopedSession, engine
+from ..db.models import MemoryEntry, Session, new_id
 from ..core.logging import logger
 
+# Both supported dialects offer ON CONFLICT upserts; resolve the right
+# insert construct once at import
+if engine.dialect.name == "postgresql":
+    from sqlalchemy.dialects.postgresql import insert as _insert
+else:
+    from sqlalchemy.dialects.sqlite import insert as _insert
+
+def _upsert_entry(db, session_id: str, key: str, value: str):
+    """Insert or update the (session_id, key) memory entry in one statement"""
+    stmt = _insert(MemoryEntry).values(
+        id=new_id(),
+        session_id=session_id,
+        key=key,
+        value=value
+    ).on_conflict_do_update(
+        index_elements=["session_id", "key"],
+        set_={"value": value}
+    )
+    db.execute(stmt)
+
 class MemoryTool:
     """Tool for storing and retrieving conversation memory"""
     
@@ -33,20 +54,15 @@ class MemoryTool:
             return {"error": "Both key and value are required"}
         
         try:
-            db = next(get_db())
-            memory_entry = MemoryEntry(
-                session_id=session_id,
-                key=key,
-                value=value
-            )
-            db.add(memory_entry)
-            db.commit()
-            
+            with ScopedSession() as db:
+                _upsert_entry(db, session_id, key, value)
+                db.commit()
+
             logger.info(
                 f"Stored memory entry for session {session_id}",
                 extra={"session_id": session_id, "tool_name": "memory_tool", "key": key}
             )
-            
+
             return {"success": True, "message": "Memory stored successfully"}
         except Exception as e:
             logger.error(
@@ -54,21 +70,19 @@ class MemoryTool:
                 extra={"session_id": session_id, "tool_name": "memory_tool"}
             )
             return {"error": f"Failed to store memory: {str(e)}"}
-        finally:
-            db.close()
     
     def _retrieve_memory(self, session_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Retrieve memory entries"""
         key = parameters.get("key")
         
         try:
-            db = next(get_db())
-            query = db.query(MemoryEntry).filter(MemoryEntry.session_id == session_id)
-            
-            if key:
-                query = query.filter(MemoryEntry.key == key)
-            
-            memory_entries = query.all()
+            with ScopedSession() as db:
+                query = db.query(MemoryEntry).filter(MemoryEntry.session_id == session_id)
+
+                if key:
+                    query = query.filter(MemoryEntry.key == key)
+
+                memory_entries = query.all()
             
             result = {
                 "entries": [
@@ -89,40 +103,32 @@ class MemoryTool:
                 extra={"session_id": session_id, "tool_name": "memory_tool"}
             )
             return {"error": f"Failed to retrieve memory: {str(e)}"}
-        finally:
-            db.close()
     
-    def _store_thread_mapping(self, session_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        """Store mapping between session ID and thread ID"""
+    def _store_thread_mapping(
+        self,
+        session_id: str,
+        parameters: Dict[str, Any],
+        db: Optional[Session] = None
+    ) -> Dict[str, Any]:
+        """Store mapping between session ID and thread ID.
+
+        When the caller passes its own db session, the session row and the
+        mapping entry ride the caller's transaction so everything commits
+        (and fsyncs) once instead of per row.
+        """
         thread_id = parameters.get("thread_id")
         user_id = parameters.get("user_id")
-        
+
         if not thread_id:
             return {"error": "Thread ID is required"}
-        
+
         try:
-            db = next(get_db())
-            
-            # Check if session exists
-            session_obj = db.query(Session).filter(Session.id == session_id).first()
-            
-            if not session_obj:
-                # Create new session
-                session_obj = Session(
-                    id=session_id,
-                    user_id=user_id
-                )
-                db.add(session_obj)
-            
-            # Store thread mapping as a memory entry
-            memory_entry = MemoryEntry(
-                session_id=session_id,
-                key="thread_id",
-                value=thread_id
-            )
-            db.add(memory_entry)
-            db.commit()
-            
+            if db is not None:
+                self._write_thread_mapping(db, session_id, thread_id, user_id)
+            else:
+                with ScopedSession() as owned_db:
+                    self._write_thread_mapping(owned_db, session_id, thread_id, user_id)
+
             logger.info(
                 f"Stored thread mapping for session {session_id}",
                 extra={"session_id": session_id, "tool_name": "memory_tool", "thread_id": thread_id}
@@ -135,34 +141,57 @@ class MemoryTool:
                 extra={"session_id": session_id, "tool_name": "memory_tool"}
             )
             return {"error": f"Failed to store thread mapping: {str(e)}"}
-        finally:
-            db.close()
+
+    @staticmethod
+    def _write_thread_mapping(db, session_id: str, thread_id: str, user_id: Optional[str]):
+        """Write the session row (if new) and mapping entry, then commit"""
+        # Check if session exists
+        session_obj = db.query(Session).filter(Session.id == session_id).first()
+
+        if not session_obj:
+            # Create new session
+            session_obj = Session(
+                id=session_id,
+                user_id=user_id
+            )
+            db.add(session_obj)
+
+        # Store thread mapping as a memory entry; the upsert keeps one
+        # row per session instead of appending a row per (re)mapping
+        _upsert_entry(db, session_id, "thread_id", thread_id)
+        db.commit()
     
     def _get_thread_id(self, session_id: str) -> Optional[str]:
         """Get thread ID for a session"""
         try:
-            db = next(get_db())
-            memory_entry = db.query(MemoryEntry).filter(
-                MemoryEntry.session_id == session_id,
-                MemoryEntry.key == "thread_id"
-            ).first()
-            
-            if memory_entry:
-                return memory_entry.value
-            return None
+            # Single column off the covering unique index — one B-tree
+            # seek, no ORM row construction
+            with ScopedSession() as db:
+                return db.execute(
+                    select(MemoryEntry.value).where(
+                        MemoryEntry.session_id == session_id,
+                        MemoryEntry.key == "thread_id"
+                    )
+                ).scalar_one_or_none()
         except Exception as e:
             logger.error(
                 f"Failed to get thread ID for session {session_id}: {str(e)}",
                 extra={"session_id": session_id, "tool_name": "memory_tool"}
             )
             return None
-        finally:
-            db.close()
     
     # Convenience methods for the ChatAgent class
-    def store_thread_mapping(self, session_id: str, thread_id: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+    def store_thread_mapping(
+        self,
+        session_id: str,
+        thread_id: str,
+        user_id: Optional[str] = None,
+        db: Optional[Session] = None
+    ) -> Dict[str, Any]:
         """Store mapping between session ID and thread ID"""
-        return self._store_thread_mapping(session_id, {"thread_id": thread_id, "user_id": user_id})
+        return self._store_thread_mapping(
+            session_id, {"thread_id": thread_id, "user_id": user_id}, db=db
+        )
     
     def get_thread_id(self, session_id: str) -> Optional[str]:
         """Get thread ID for a session"""
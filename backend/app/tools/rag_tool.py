@@ -1,8 +1,13 @@
 # backend/app/tools/rag_tool.py
-from typing import Dict, Any, List
-import hashlib
-from ..vector_store.chroma_client import ChromaClient
-from ..vector_store.embeddings import EmbeddingModel
+from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+import queue
+import threading
+import numpy as np
+import xxhash
+from ..vector_store.chroma_client import get_chroma_client
+from ..vector_store.embeddings import EmbeddingModel, get_embedding_model
 from ..core.cache import cache_manager, cache_result
 from ..core.logging import logger
 from ..core.config import settings
@@ -12,17 +17,64 @@ class RAGTool:
     """Tool for Retrieval-Augmented Generation with caching"""
     
     def __init__(self):
-        self.chroma_client = ChromaClient(
-            persist_directory=settings.chroma_persist_directory
-        )
-        self.embedding_model = EmbeddingModel(
-            model_name=settings.embedding_model_name
+        # Shared singletons: RAGTool may be constructed more than once per
+        # process, but the model weights and Chroma handle load only once
+        self.embedding_model = get_embedding_model(settings.embedding_model_name)
+        self.chroma_client = get_chroma_client(
+            settings.chroma_persist_directory,
+            embedding_model_name=settings.embedding_model_name
         )
     
-    def _generate_cache_key(self, query: str, n_results: int) -> str:
+    def _generate_cache_key(self, query: str, n_results: int, epoch: int) -> str:
         """Generate cache key for RAG query"""
-        query_hash = hashlib.md5(query.encode()).hexdigest()
-        return f"rag_query:{query_hash}:{n_results}"
+        # xxh3 runs at SIMD speed; cache keys only need hash quality, not
+        # cryptographic collision resistance, so MD5 was pure overhead
+        query_hash = xxhash.xxh3_64_hexdigest(query)
+        return f"rag_query:{epoch}:{query_hash}:{n_results}"
+
+    def _generate_approx_cache_key(
+        self, embedding: List[float], n_results: int, epoch: int
+    ) -> str:
+        """Generate an approximate cache key from a sign-quantized embedding.
+
+        Near-duplicate queries (follow-ups, rewordings) land on the same
+        quantized key, letting us serve cached results without a vector search.
+        """
+        signs = np.packbits(np.asarray(embedding)[::8] > 0)
+        return f"rag_approx:{epoch}:{signs.tobytes().hex()}:{n_results}"
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        """Embed a query, reusing a cached embedding for the same text.
+
+        Keyed by the normalized query alone — unlike the result cache keys,
+        which include n_results — so repeat searches with different result
+        counts share one forward pass.
+        """
+        normalized = " ".join(query.lower().split())
+        embed_key = f"rag_embed:{xxhash.xxh3_64_hexdigest(normalized)}"
+
+        cached = cache_manager.get(embed_key)
+        if cached is not None:
+            return EmbeddingModel.dequantize_embedding(cached)
+
+        embedding = self.embedding_model.embed_query(query)
+        # int8-quantized to cut the Redis payload ~4x
+        cache_manager.set(
+            embed_key,
+            EmbeddingModel.quantize_embedding(embedding),
+            ttl=3600
+        )
+        return embedding
+
+    @staticmethod
+    def _cosine_similarity(a: List[float], b: List[float]) -> float:
+        """Compute cosine similarity between two embeddings"""
+        a = np.asarray(a, dtype=np.float32)
+        b = np.asarray(b, dtype=np.float32)
+        denom = float(np.linalg.norm(a) * np.linalg.norm(b))
+        if denom == 0.0:
+            return 0.0
+        return float(np.dot(a, b) / denom)
     
     @track_rag_metrics
     def execute(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
@@ -33,9 +85,20 @@ class RAGTool:
             return self._search_cached(parameters)
         elif action == "add_document":
             return self._add_document(parameters)
+        elif action == "add_documents":
+            return self._add_documents(parameters)
         else:
             return {"error": f"Unknown action: {action}"}
     
+    async def aexecute(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Async execute: runs the blocking tool work in a worker thread.
+
+        Embedding (GPU/BLAS) and Chroma's HNSW walk both release the GIL,
+        so concurrent requests overlap instead of serializing the event
+        loop behind a single embed -> query chain.
+        """
+        return await asyncio.to_thread(self.execute, parameters)
+
     def _search_cached(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Search with caching"""
         query = parameters.get("query")
@@ -45,56 +108,99 @@ class RAGTool:
         if not query:
             return {"error": "Query is required"}
         
-        # Generate cache key
-        cache_key = self._generate_cache_key(query, n_results)
+        # Generate cache key; the epoch prefix lets document adds
+        # invalidate every result entry with one INCR instead of a scan
+        epoch = cache_manager.get_counter("rag:epoch")
+        cache_key = self._generate_cache_key(query, n_results, epoch)
         
         # Try to get from cache
         cached_result = cache_manager.get(cache_key)
         if cached_result:
-            logger.info(
-                f"RAG cache hit for query: {query[:50]}...",
-                extra={"session_id": session_id, "tool_name": "rag_tool"}
-            )
+            # Gate the extra-dict build: at WARNING level the slice,
+            # f-string and dict would be paid on every cache hit for nothing
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "RAG cache hit for query: %.50s...", query,
+                    extra={"session_id": session_id, "tool_name": "rag_tool"}
+                )
             return cached_result
         
+        # Check the approximate cache: embeddings of near-duplicate queries
+        # are close in vector space even when their text differs
+        query_embedding = self._get_query_embedding(query)
+        approx_key = self._generate_approx_cache_key(query_embedding, n_results, epoch)
+
+        cached_entry = cache_manager.get(approx_key)
+        if cached_entry and self._cosine_similarity(
+            query_embedding,
+            EmbeddingModel.dequantize_embedding(cached_entry["embedding"])
+        ) >= settings.rag_similarity_threshold:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "RAG approximate cache hit for query: %.50s...", query,
+                    extra={"session_id": session_id, "tool_name": "rag_tool"}
+                )
+            cache_manager.set(cache_key, cached_entry["result"], ttl=1800)
+            return cached_entry["result"]
+
         # Perform search
-        result = self._search(parameters)
-        
-        # Cache result for 30 minutes
+        result = self._search(parameters, query_embedding=query_embedding)
+
+        # Cache result for 30 minutes, plus the embedding-keyed entry so
+        # similar future queries can skip the vector search
         cache_manager.set(cache_key, result, ttl=1800)
-        
+        if "error" not in result:
+            # Store the embedding int8-quantized to cut the Redis payload ~4x
+            cache_manager.set(
+                approx_key,
+                {
+                    "embedding": EmbeddingModel.quantize_embedding(query_embedding),
+                    "result": result
+                },
+                ttl=1800
+            )
+
         return result
-    
-    def _search(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+
+    def _search(
+        self,
+        parameters: Dict[str, Any],
+        query_embedding: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
         """Perform actual search"""
         query = parameters.get("query")
         n_results = parameters.get("n_results", 5)
         session_id = parameters.get("session_id")
-        
+
         try:
-            # Generate embedding for the query
-            query_embedding = self.embedding_model.embed_query(query)
-            
+            # Generate embedding for the query unless the caller already did
+            if query_embedding is None:
+                query_embedding = self.embedding_model.embed_query(query)
+
             # Search in Chroma
             results = self.chroma_client.query(
                 query_embeddings=[query_embedding],
                 n_results=n_results
             )
             
-            # Format results
-            documents = []
-            for i, doc in enumerate(results["documents"][0]):
-                documents.append({
-                    "id": results["ids"][0][i],
-                    "content": doc,
-                    "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
-                    "distance": results["distances"][0][i] if "distances" in results else None
-                })
+            # Format results in one zip pass: the nested-list lookups move
+            # out of the loop, and the comprehension builds the list without
+            # per-iteration append calls
+            ids = results["ids"][0]
+            docs = results["documents"][0]
+            metas = results["metadatas"][0] if results["metadatas"] else [{}] * len(docs)
+            dists = results["distances"][0] if "distances" in results else [None] * len(docs)
+            documents = [
+                {"id": doc_id, "content": doc, "metadata": meta, "distance": dist}
+                for doc_id, doc, meta, dist in zip(ids, docs, metas, dists)
+            ]
             
-            logger.info(
-                f"RAG search for session {session_id} returned {len(documents)} documents",
-                extra={"session_id": session_id, "tool_name": "rag_tool", "query": query}
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "RAG search for session %s returned %d documents",
+                    session_id, len(documents),
+                    extra={"session_id": session_id, "tool_name": "rag_tool", "query": query}
+                )
             
             return {"documents": documents}
         except Exception as e:
@@ -104,6 +210,74 @@ class RAGTool:
             )
             return {"error": f"Search failed: {str(e)}"}
     
+    def _add_documents(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a batch of documents to the vector store in one call"""
+        items = parameters.get("documents")
+
+        if not items:
+            return {"error": "Documents are required"}
+
+        try:
+            contents = [item["content"] for item in items]
+            metadatas = [item.get("metadata", {}) for item in items]
+            ids = [item.get("document_id") for item in items]
+            batch_size = settings.embedding_batch_size
+
+            # Two-stage pipeline: the embedder (GPU/CPU compute) fills a
+            # bounded queue while a writer thread drains it into Chroma
+            # (disk/HNSW work), so batch N+1 embeds while batch N writes
+            write_queue: queue.Queue = queue.Queue(maxsize=4)
+            write_errors: List[Exception] = []
+
+            def _writer():
+                while True:
+                    work = write_queue.get()
+                    if work is None:
+                        break
+                    try:
+                        self.chroma_client.add(**work)
+                    except Exception as write_error:
+                        write_errors.append(write_error)
+                    finally:
+                        write_queue.task_done()
+
+            writer = threading.Thread(target=_writer, daemon=True)
+            writer.start()
+
+            for start in range(0, len(contents), batch_size):
+                window = slice(start, start + batch_size)
+                embeddings = self.embedding_model.embed_documents(
+                    contents[window], batch_size=batch_size
+                )
+                write_queue.put({
+                    "documents": contents[window],
+                    "embeddings": embeddings,
+                    "metadatas": metadatas[window],
+                    "ids": ids[window]
+                })
+
+            write_queue.put(None)
+            writer.join()
+            if write_errors:
+                raise write_errors[0]
+
+            # Bump the epoch: prior result entries become unreachable in
+            # O(1) and expire via their TTLs, with no keyspace scan
+            cache_manager.incr("rag:epoch")
+
+            logger.info(
+                f"Added {len(items)} documents to vector store",
+                extra={"tool_name": "rag_tool", "count": len(items)}
+            )
+
+            return {"success": True, "count": len(items)}
+        except Exception as e:
+            logger.error(
+                f"Failed to bulk-add documents to vector store: {str(e)}",
+                extra={"tool_name": "rag_tool"}
+            )
+            return {"error": f"Failed to add documents: {str(e)}"}
+
     def _add_document(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Add a document to the vector store"""
         content = parameters.get("content")
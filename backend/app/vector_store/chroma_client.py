@@ -1,25 +1,61 @@
 # backend/app/vector_store/chroma_client.py
 import chromadb
+import logging
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from ..core.logging import logger
+from ..core.config import settings
+
+class ModelEmbeddingFunction(chromadb.EmbeddingFunction):
+    """Adapts EmbeddingModel's batched embed_documents for Chroma.
+
+    Registered on the collection so query_texts/documents calls embed
+    natively on the Chroma side, in one batched forward pass, instead of
+    the caller pre-embedding one item at a time.
+    """
+
+    def __init__(self, embedding_model):
+        self._model = embedding_model
+
+    def __call__(self, input):
+        return self._model.embed_documents(list(input))
 
 class ChromaClient:
     """Client for interacting with Chroma vector database"""
-    
-    def __init__(self, persist_directory: str, collection_name: str = "knowledge_base"):
+
+    def __init__(
+        self,
+        persist_directory: str,
+        collection_name: str = "knowledge_base",
+        embedding_model=None
+    ):
         self.persist_directory = persist_directory
         self.collection_name = collection_name
-        
+
         # Initialize Chroma client
         self.client = chromadb.PersistentClient(path=persist_directory)
-        
-        # Get or create collection
-        try:
-            self.collection = self.client.get_collection(name=collection_name)
-            logger.info(f"Connected to existing Chroma collection: {collection_name}")
-        except Exception:
-            self.collection = self.client.create_collection(name=collection_name)
-            logger.info(f"Created new Chroma collection: {collection_name}")
+
+        # Get or create collection with tuned ANN parameters: embeddings
+        # are L2-normalized at the pooling step, so inner-product space
+        # gives cosine ranking at dot-product cost, and the HNSW settings
+        # trade a little build time for faster, higher-recall queries than
+        # the library defaults. Only pass an embedding function when the
+        # caller supplies a model, so other users never trigger Chroma's
+        # default-model download.
+        kwargs = {}
+        if embedding_model is not None:
+            kwargs["embedding_function"] = ModelEmbeddingFunction(embedding_model)
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name,
+            metadata={
+                "hnsw:space": "ip",
+                "hnsw:M": settings.chroma_hnsw_m,
+                "hnsw:construction_ef": settings.chroma_hnsw_construction_ef,
+                "hnsw:search_ef": settings.chroma_hnsw_search_ef,
+            },
+            **kwargs
+        )
+        logger.info(f"Connected to Chroma collection: {collection_name}")
     
     def add(
         self,
@@ -68,10 +104,14 @@ class ChromaClient:
                 where_document=where_document
             )
             
-            logger.info(
-                f"Queried Chroma collection, returned {len(result['ids'][0])} results",
-                extra={"tool_name": "chroma_client", "result_count": len(result['ids'][0])}
-            )
+            # query() runs once per uncached search; skip the extra dict
+            # entirely when INFO is filtered out
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Queried Chroma collection, returned %d results",
+                    len(result['ids'][0]),
+                    extra={"tool_name": "chroma_client", "result_count": len(result['ids'][0])}
+                )
             
             return result
         except Exception as e:
@@ -107,3 +147,25 @@ class ChromaClient:
                 extra={"tool_name": "chroma_client"}
             )
             raise
+
+@lru_cache(maxsize=4)
+def get_chroma_client(
+    persist_directory: str,
+    collection_name: str = "knowledge_base",
+    embedding_model_name: Optional[str] = None
+) -> ChromaClient:
+    """Process-wide ChromaClient per persist directory and collection.
+
+    One PersistentClient per directory avoids duplicate SQLite handles and
+    HNSW index copies; the embedding model (when named) comes from its own
+    singleton factory.
+    """
+    embedding_model = None
+    if embedding_model_name is not None:
+        from .embeddings import get_embedding_model
+        embedding_model = get_embedding_model(embedding_model_name)
+    return ChromaClient(
+        persist_directory,
+        collection_name=collection_name,
+        embedding_model=embedding_model
+    )
@@ -1,7 +1,9 @@
 # backend/app/vector_store/embeddings.py
 import torch
+import numpy as np
+from functools import lru_cache
 from transformers import AutoTokenizer, AutoModel
-from typing import List
+from typing import Dict, Any, List, Optional
 from ..core.logging import logger
 from ..core.config import settings
 
@@ -12,14 +14,57 @@ class EmbeddingModel:
         self.model_name = model_name or settings.embedding_model_name
         
         try:
-            # Load tokenizer and model
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self.model = AutoModel.from_pretrained(self.model_name)
-            
-            # Move model to GPU if available
-            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            self.model.to(self.device)
-            
+            if settings.embedding_onnx_dir:
+                # int8 ONNX model exported by scripts/quantize_embedding_model.py;
+                # onnxruntime runs the quantized GEMMs (VNNI) on CPU at ~4x
+                # FP32 throughput, so autocast/eval do not apply here
+                from optimum.onnxruntime import ORTModelForFeatureExtraction
+                self.tokenizer = AutoTokenizer.from_pretrained(settings.embedding_onnx_dir)
+                self.model = ORTModelForFeatureExtraction.from_pretrained(
+                    settings.embedding_onnx_dir,
+                    provider="CPUExecutionProvider"
+                )
+                self.device = torch.device("cpu")
+            else:
+                # Load tokenizer and model
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self.model = AutoModel.from_pretrained(self.model_name)
+
+                # Move model to GPU if available
+                self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+                self.model.to(self.device)
+                self.model.eval()
+
+                # Compiled graphs skip Python op dispatch between kernels;
+                # fall back to eager if the backend can't handle the model
+                if hasattr(torch, "compile"):
+                    try:
+                        self.model = torch.compile(
+                            self.model, mode="reduce-overhead", dynamic=True
+                        )
+                    except Exception as compile_error:
+                        logger.warning(
+                            f"torch.compile unavailable, running eager: {compile_error}",
+                            extra={"tool_name": "embedding_model"}
+                        )
+            # Autocast halves activation bandwidth and uses tensor-core /
+            # BF16 matmuls where available; fp32 weights stay the master
+            # copy (a no-op wrapper around the ONNX path)
+            self._autocast_dtype = (
+                torch.float16 if self.device.type == "cuda" else torch.bfloat16
+            )
+
+            # Warm up so the first user request doesn't pay compilation,
+            # kernel autotune, or tokenizer lazy-init costs
+            try:
+                for _ in range(2):
+                    self.embed_query("warmup")
+            except Exception as warmup_error:
+                logger.warning(
+                    f"Embedding model warmup failed: {warmup_error}",
+                    extra={"tool_name": "embedding_model"}
+                )
+
             logger.info(
                 f"Loaded embedding model: {self.model_name} on {self.device}",
                 extra={"tool_name": "embedding_model", "model": self.model_name, "device": str(self.device)}
@@ -31,6 +76,28 @@ class EmbeddingModel:
             )
             raise
     
+    @staticmethod
+    def quantize_embedding(embedding: List[float]) -> Dict[str, Any]:
+        """Quantize an FP32 embedding to int8 with a symmetric per-vector scale.
+
+        Cuts stored/transferred size roughly 4x while keeping cosine
+        similarity within ~1% — enough for cache lookups and reranking.
+        """
+        vec = np.asarray(embedding, dtype=np.float32)
+        scale = float(np.abs(vec).max() / 127.0) if vec.size else 0.0
+        if scale == 0.0:
+            return {"scale": 0.0, "values": [0] * vec.size}
+        return {
+            "scale": scale,
+            "values": np.clip(np.round(vec / scale), -127, 127).astype(np.int8).tolist()
+        }
+
+    @staticmethod
+    def dequantize_embedding(quantized: Dict[str, Any]) -> List[float]:
+        """Restore an FP32 embedding from its int8 quantized form"""
+        values = np.asarray(quantized["values"], dtype=np.float32)
+        return (values * quantized["scale"]).tolist()
+
     def embed_query(self, query: str) -> List[float]:
         """Generate embedding for a query"""
         try:
@@ -38,12 +105,23 @@ class EmbeddingModel:
             inputs = self.tokenizer(query, return_tensors="pt", truncation=True, padding=True)
             inputs = {k: v.to(self.device) for k, v in inputs.items()}
             
-            # Generate embeddings
-            with torch.no_grad():
+            # Generate embeddings; inference_mode skips autograd version
+            # tracking that no_grad still pays for
+            with torch.inference_mode(), torch.autocast(
+                device_type=self.device.type, dtype=self._autocast_dtype
+            ):
                 outputs = self.model(**inputs)
-                # Use mean pooling of the last hidden state
-                embeddings = outputs.last_hidden_state.mean(dim=1).cpu().numpy()
-            
+                # Fused mask-weighted mean pooling: the einsum contracts
+                # hidden states and mask in one kernel (and, unlike plain
+                # .mean, ignores padding), then L2-normalize so cosine
+                # similarity reduces to a dot product downstream
+                hidden = outputs.last_hidden_state
+                mask = inputs["attention_mask"].to(hidden.dtype)
+                pooled = torch.einsum("bsh,bs->bh", hidden, mask)
+                pooled = pooled / mask.sum(dim=1, keepdim=True).clamp(min=1)
+                pooled = torch.nn.functional.normalize(pooled, dim=-1)
+                embeddings = pooled.float().cpu().numpy()
+
             # Convert to list
             return embeddings[0].tolist()
         except Exception as e:
@@ -60,19 +138,69 @@ class EmbeddingModel:
         # and embed each chunk separately
         return self.embed_query(document)
     
-    def embed_documents(self, documents: List[str]) -> List[List[float]]:
-        """Generate embeddings for multiple documents"""
-        embeddings = []
-        for doc in documents:
+    def embed_documents(self, documents: List[str], batch_size: int = None) -> List[np.ndarray]:
+        """Generate embeddings for multiple documents in batched forward passes.
+
+        Returns L2-normalized fp16 vectors: half the payload into Chroma's
+        index with no retrieval cost since the space is inner-product.
+        """
+        batch_size = batch_size or settings.embedding_batch_size
+
+        # Length-bucketed batching: padding cost is set by the longest item
+        # in a batch, so grouping similar-length documents (char length as a
+        # token-count proxy) avoids padding short texts up to the longest in
+        # a mixed batch. Results are scattered back to the caller's order.
+        order = sorted(range(len(documents)), key=lambda i: len(documents[i]))
+        embeddings: List[Optional[np.ndarray]] = [None] * len(documents)
+
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            chunk = [documents[i] for i in indices]
             try:
-                embedding = self.embed_document(doc)
-                embeddings.append(embedding)
+                # One padded forward pass per batch instead of one per
+                # document; the transformer forward dominates, so batching
+                # amortizes its overhead across the whole chunk
+                inputs = self.tokenizer(
+                    chunk,
+                    padding=True,
+                    truncation=True,
+                    max_length=512,
+                    return_tensors="pt"
+                )
+                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+
+                with torch.inference_mode(), torch.autocast(
+                    device_type=self.device.type, dtype=self._autocast_dtype
+                ):
+                    outputs = self.model(**inputs)
+                    # Fused mask-weighted mean pooling: one einsum kernel
+                    # instead of a broadcast multiply that materializes a
+                    # second hidden-state-sized tensor
+                    hidden = outputs.last_hidden_state
+                    mask = inputs["attention_mask"].to(hidden.dtype)
+                    pooled = torch.einsum("bsh,bs->bh", hidden, mask)
+                    pooled = pooled / mask.sum(dim=1, keepdim=True).clamp(min=1)
+                    pooled = torch.nn.functional.normalize(pooled, dim=-1)
+
+                for i, row in zip(indices, pooled.half().cpu().numpy()):
+                    embeddings[i] = row
             except Exception as e:
                 logger.error(
-                    f"Failed to embed document: {str(e)}",
-                    extra={"tool_name": "embedding_model"}
+                    f"Failed to embed document batch: {str(e)}",
+                    extra={"tool_name": "embedding_model", "batch_size": len(chunk)}
                 )
-                # Add a zero embedding as a fallback
-                embeddings.append([0.0] * self.model.config.hidden_size)
-        
+                # Add zero embeddings as a fallback for the failed batch
+                fallback = np.zeros(self.model.config.hidden_size, dtype=np.float16)
+                for i in indices:
+                    embeddings[i] = fallback
+
         return embeddings
+
+@lru_cache(maxsize=4)
+def get_embedding_model(model_name: Optional[str] = None) -> EmbeddingModel:
+    """Process-wide EmbeddingModel per model name.
+
+    from_pretrained loads ~hundreds of MB of weights; constructing one
+    instance per RAGTool (or per health probe) would reload them each time.
+    """
+    return EmbeddingModel(model_name=model_name)
@@ -29,6 +29,8 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from sqlalchemy import func, insert, inspect, select, text
+
 from app.db.database import engine, SessionLocal, Base
 from app.db.models import Session, Message, MemoryEntry, Attachment
 from app.core.config import settings
@@ -42,11 +44,31 @@ logger = logging.getLogger(__name__)
 class DatabaseInitializer:
     """Handles database initialization operations"""
     
-    def __init__(self, force: bool = False, seed: bool = False, migrate: bool = False):
+    def __init__(
+        self,
+        force: bool = False,
+        seed: bool = False,
+        migrate: bool = False,
+        documents_dir: Optional[str] = None
+    ):
         self.force = force
         self.seed = seed
         self.migrate = migrate
+        self.documents_dir = documents_dir
         self.db_session = SessionLocal()
+        self._table_names: Optional[List[str]] = None
+
+    def _bulk_insert(self, model, rows: List[Dict[str, Any]]) -> None:
+        """Insert seed rows with one Core executemany instead of per-row adds.
+
+        Core inserts skip the unit-of-work identity map and per-object
+        history tracking; wide insertmanyvalues pages turn each table's
+        seed into a single multi-VALUES statement.
+        """
+        self.db_session.execute(
+            insert(model).execution_options(insertmanyvalues_page_size=5000),
+            rows
+        )
         
     def run_migrations(self) -> bool:
         """Run database migrations using Alembic"""
@@ -56,15 +78,14 @@ class DatabaseInitializer:
             # Configure Alembic
             alembic_cfg = Config("alembic.ini")
             alembic_cfg.set_main_option("sqlalchemy.url", settings.database_url)
-            
-            # Run migrations
+
             command.upgrade(alembic_cfg, "head")
-            
+
             logger.info("Database migrations completed successfully")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to run migrations: {str(e)}")
+            logger.error("Failed to run migrations: %s", e)
             return False
     
     def drop_tables(self) -> bool:
@@ -72,7 +93,19 @@ class DatabaseInitializer:
         try:
             if self.force:
                 logger.warning("Dropping all existing tables...")
-                Base.metadata.drop_all(bind=engine)
+                if engine.dialect.name == "postgresql":
+                    # Recreating the schema is two statements regardless of
+                    # table count and sidesteps FK drop ordering entirely
+                    with engine.begin() as conn:
+                        conn.execute(text("DROP SCHEMA public CASCADE"))
+                        conn.execute(text("CREATE SCHEMA public"))
+                else:
+                    # Passing the known tables skips drop_all's reflection
+                    # pass over the live schema (one catalog query per table)
+                    Base.metadata.drop_all(
+                        bind=engine,
+                        tables=list(reversed(Base.metadata.sorted_tables))
+                    )
                 logger.info("All tables dropped successfully")
                 return True
             else:
@@ -80,7 +113,7 @@ class DatabaseInitializer:
                 return True
                 
         except Exception as e:
-            logger.error(f"Failed to drop tables: {str(e)}")
+            logger.error("Failed to drop tables: %s", e)
             return False
     
     def create_tables(self) -> bool:
@@ -88,18 +121,26 @@ class DatabaseInitializer:
         try:
             logger.info("Creating database tables...")
             
-            # Create all tables
-            Base.metadata.create_all(bind=engine)
+            # Create all tables; the explicit table list avoids reflecting
+            # the whole schema, checkfirst still skips existing tables
+            Base.metadata.create_all(
+                bind=engine,
+                tables=Base.metadata.sorted_tables,
+                checkfirst=True
+            )
             
-            # Verify tables were created
-            inspector = engine.dialect.get_inspector(engine)
-            tables = inspector.get_table_names()
+            # Verify tables were created; cache the names so
+            # verify_database doesn't repeat the catalog round-trips
+            self._table_names = inspect(engine).get_table_names()
             
-            logger.info(f"Created {len(tables)} tables: {', '.join(tables)}")
+            logger.info(
+                "Created %d tables: %s",
+                len(self._table_names), ", ".join(self._table_names)
+            )
             return True
             
         except Exception as e:
-            logger.error(f"Failed to create tables: {str(e)}")
+            logger.error("Failed to create tables: %s", e)
             return False
     
     def insert_seed_data(self) -> bool:
@@ -111,20 +152,22 @@ class DatabaseInitializer:
             
             logger.info("Inserting seed data...")
             
-            # Seed sessions
-            self._seed_sessions()
-            
-            # Seed memory entries
-            self._seed_memory_entries()
-            
-            # Seed messages
-            self._seed_messages()
+            # One transaction for all three tables: a single fsync at
+            # commit instead of one per table. Deliberately serial — the
+            # message/memory inserts are independent of each other, but
+            # parallelizing them needs a second connection and therefore a
+            # second commit, which costs more than it saves at this row
+            # count (three executemany statements on one connection)
+            with self.db_session.begin():
+                self._seed_sessions()
+                self._seed_memory_entries()
+                self._seed_messages()
             
             logger.info("Seed data inserted successfully")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to insert seed data: {str(e)}")
+            logger.error("Failed to insert seed data: %s", e)
             return False
     
     def _seed_sessions(self) -> None:
@@ -142,12 +185,8 @@ class DatabaseInitializer:
             }
         ]
         
-        for session_data in sample_sessions:
-            session = Session(**session_data)
-            self.db_session.add(session)
-        
-        self.db_session.commit()
-        logger.info(f"Created {len(sample_sessions)} sample sessions")
+        self._bulk_insert(Session, sample_sessions)
+        logger.info("Created %s sample sessions", len(sample_sessions))
     
     def _seed_memory_entries(self) -> None:
         """Seed sample memory entries"""
@@ -169,12 +208,8 @@ class DatabaseInitializer:
             }
         ]
         
-        for memory_data in sample_memories:
-            memory = MemoryEntry(**memory_data)
-            self.db_session.add(memory)
-        
-        self.db_session.commit()
-        logger.info(f"Created {len(sample_memories)} sample memory entries")
+        self._bulk_insert(MemoryEntry, sample_memories)
+        logger.info("Created %s sample memory entries", len(sample_memories))
     
     def _seed_messages(self) -> None:
         """Seed sample messages"""
@@ -201,51 +236,103 @@ class DatabaseInitializer:
             }
         ]
         
-        for message_data in sample_messages:
-            message = Message(**message_data)
-            self.db_session.add(message)
-        
-        self.db_session.commit()
-        logger.info(f"Created {len(sample_messages)} sample messages")
+        self._bulk_insert(Message, sample_messages)
+        logger.info("Created %s sample messages", len(sample_messages))
     
+    def seed_documents(self, documents_dir: str) -> bool:
+        """Bulk-load an initial document corpus into the vector store.
+
+        Files go through RAGTool's batched add_documents action, which
+        embeds in batched forward passes and overlaps embedding with
+        Chroma writes, rather than one embed-and-add call per file.
+        """
+        try:
+            doc_path = Path(documents_dir)
+            if not doc_path.is_dir():
+                logger.error("Documents directory not found: %s", documents_dir)
+                return False
+
+            # Import here so plain schema runs don't load the embedding model
+            from app.db.models import new_id
+            from app.tools.rag_tool import RAGTool
+
+            items = []
+            for file_path in sorted(doc_path.rglob("*")):
+                if file_path.suffix.lower() not in (".txt", ".md"):
+                    continue
+                content = file_path.read_text(encoding="utf-8", errors="ignore")
+                if not content.strip():
+                    continue
+                items.append({
+                    "content": content,
+                    "metadata": {"source": str(file_path.relative_to(doc_path))},
+                    "document_id": new_id()
+                })
+
+            if not items:
+                logger.warning("No seed documents found in %s", documents_dir)
+                return True
+
+            logger.info("Seeding %s documents into the vector store...", len(items))
+            rag_tool = RAGTool()
+            result = rag_tool.execute({"action": "add_documents", "documents": items})
+            if "error" in result:
+                logger.error("Failed to seed documents: %s", result['error'])
+                return False
+
+            logger.info("Seeded %s documents successfully", result['count'])
+            return True
+
+        except Exception as e:
+            logger.error("Failed to seed documents: %s", e)
+            return False
+
     def verify_database(self) -> bool:
         """Verify database integrity"""
         try:
             logger.info("Verifying database integrity...")
             
-            # Check if all tables exist
-            inspector = engine.dialect.get_inspector(engine)
+            # Check if all tables exist, reusing the names cached by
+            # create_tables instead of re-querying the catalog
             expected_tables = ['sessions', 'messages', 'memory_entries', 'attachments']
-            existing_tables = inspector.get_table_names()
+            existing_tables = self._table_names
+            if existing_tables is None:
+                existing_tables = inspect(engine).get_table_names()
             
             missing_tables = set(expected_tables) - set(existing_tables)
             if missing_tables:
-                logger.error(f"Missing tables: {', '.join(missing_tables)}")
+                logger.error("Missing tables: %s", ', '.join(missing_tables))
                 return False
             
-            # Check table counts
-            session_count = self.db_session.query(Session).count()
-            message_count = self.db_session.query(Message).count()
-            memory_count = self.db_session.query(MemoryEntry).count()
+            # Check table counts: three scalar subqueries in one SELECT,
+            # one round-trip instead of three. select(func.count()) emits a
+            # direct COUNT(*) — the legacy query().count() wraps a subquery
+            session_count, message_count, memory_count = self.db_session.execute(
+                select(
+                    select(func.count()).select_from(Session).scalar_subquery(),
+                    select(func.count()).select_from(Message).scalar_subquery(),
+                    select(func.count()).select_from(MemoryEntry).scalar_subquery(),
+                )
+            ).one()
             
-            logger.info(f"Database verification passed:")
-            logger.info(f"  - Sessions: {session_count}")
-            logger.info(f"  - Messages: {message_count}")
-            logger.info(f"  - Memory entries: {memory_count}")
+            logger.info("Database verification passed:")
+            logger.info("  - Sessions: %s", session_count)
+            logger.info("  - Messages: %s", message_count)
+            logger.info("  - Memory entries: %s", memory_count)
             
             return True
             
         except Exception as e:
-            logger.error(f"Database verification failed: {str(e)}")
+            logger.error("Database verification failed: %s", e)
             return False
     
     def initialize(self) -> bool:
         """Run the complete database initialization process"""
         logger.info("Starting database initialization...")
-        logger.info(f"Database URL: {settings.database_url}")
-        logger.info(f"Force mode: {self.force}")
-        logger.info(f"Seed data: {self.seed}")
-        logger.info(f"Run migrations: {self.migrate}")
+        logger.info("Database URL: %s", settings.database_url)
+        logger.info("Force mode: %s", self.force)
+        logger.info("Seed data: %s", self.seed)
+        logger.info("Run migrations: %s", self.migrate)
         
         try:
             # Step 1: Run migrations if requested
@@ -253,19 +340,29 @@ class DatabaseInitializer:
                 if not self.run_migrations():
                     return False
             
-            # Step 2: Drop existing tables if force mode
-            if not self.drop_tables():
-                return False
-            
-            # Step 3: Create tables
-            if not self.create_tables():
-                return False
+            # Steps 2-3: migrations already brought the schema to head, so
+            # re-running drop/create_all would just repeat the reflection
+            # (and could resurrect tables a down-revision removed); only
+            # --force overrides that and rebuilds from the models
+            if self.force or not self.migrate:
+                # Step 2: Drop existing tables if force mode
+                if not self.drop_tables():
+                    return False
+                
+                # Step 3: Create tables
+                if not self.create_tables():
+                    return False
             
             # Step 4: Insert seed data if requested
             if not self.insert_seed_data():
                 return False
             
-            # Step 5: Verify database
+            # Step 5: Seed the document corpus if a directory was given
+            if self.documents_dir:
+                if not self.seed_documents(self.documents_dir):
+                    return False
+            
+            # Step 6: Verify database
             if not self.verify_database():
                 return False
             
@@ -273,7 +370,7 @@ class DatabaseInitializer:
             return True
             
         except Exception as e:
-            logger.error(f"Database initialization failed: {str(e)}")
+            logger.error("Database initialization failed: %s", e)
             return False
         
         finally:
@@ -317,6 +414,13 @@ Examples:
         help="Run database migrations before initialization"
     )
     
+    parser.add_argument(
+        "--documents-dir",
+        type=str,
+        default=None,
+        help="Directory of seed documents to bulk-load into the vector store"
+    )
+    
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -339,7 +443,8 @@ def main() -> int:
     initializer = DatabaseInitializer(
         force=args.force,
         seed=args.seed,
-        migrate=args.migrate
+        migrate=args.migrate,
+        documents_dir=args.documents_dir
     )
     
     try:
@@ -359,7 +464,7 @@ def main() -> int:
         return 1
     
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+        logger.error("Unexpected error: %s", e)
         print(f"\n❌ Unexpected error: {str(e)}")
         return 1
     
@@ -2,6 +2,7 @@
 import argparse
 from alembic.config import Config
 from alembic import command
+from app.core.config import settings
 from app.core.logging import logger, setup_logging
 
 def migrate(direction: str, revision: str = None):
@@ -11,23 +12,21 @@ def migrate(direction: str, revision: str = None):
     
     # Load Alembic configuration
     alembic_cfg = Config("alembic.ini")
-    
+    alembic_cfg.set_main_option("sqlalchemy.url", settings.database_url)
+
     try:
         if direction == "upgrade":
-            if revision:
-                command.upgrade(alembic_cfg, revision)
-            else:
-                command.upgrade(alembic_cfg, "head")
-            logger.info(f"Database upgraded to revision: {revision or 'head'}")
+            command.upgrade(alembic_cfg, revision or "head")
+            logger.info("Database upgraded to revision: %s", revision or 'head')
         elif direction == "downgrade":
             if not revision:
                 raise ValueError("Revision is required for downgrade")
             command.downgrade(alembic_cfg, revision)
-            logger.info(f"Database downgraded to revision: {revision}")
+            logger.info("Database downgraded to revision: %s", revision)
         else:
             raise ValueError(f"Invalid migration direction: {direction}")
     except Exception as e:
-        logger.error(f"Migration failed: {str(e)}")
+        logger.error("Migration failed: %s", e)
         raise
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+ =============================================================================
+ Customer Support AI Agent - Embedding Model Quantization Script
+ =============================================================================
+
+ One-time export of the HuggingFace embedding model to ONNX with dynamic
+ int8 quantization. The quantized model runs int8 GEMMs (VNNI on modern
+ CPUs) at roughly 4x FP32 throughput with half the memory bandwidth,
+ which dominates RAG latency on CPU-only deployments.
+
+ Point settings.embedding_onnx_dir (EMBEDDING_ONNX_DIR in .env) at the
+ output directory to make EmbeddingModel load the quantized model.
+
+ Usage:
+     python scripts/quantize_embedding_model.py --output-dir ./onnx_model
+
+ Options:
+     --model-name       HuggingFace model to export (default: from settings)
+     --output-dir       Directory for the quantized ONNX model
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+def quantize_model(model_name: str, output_dir: str) -> None:
+    """Export the model to ONNX and apply dynamic int8 quantization"""
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    logger.info(f"Exporting {model_name} to ONNX")
+    model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+    model.save_pretrained(output_path)
+
+    logger.info("Applying dynamic int8 quantization")
+    quantizer = ORTQuantizer.from_pretrained(output_path)
+    quantizer.quantize(
+        save_dir=output_path,
+        quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False)
+    )
+
+    # Ship the tokenizer alongside so the directory is self-contained
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_path)
+
+    logger.info(f"Quantized model written to {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize the embedding model to int8 ONNX")
+    parser.add_argument(
+        "--model-name",
+        default=settings.embedding_model_name,
+        help="HuggingFace model to export"
+    )
+    parser.add_argument(
+        "--output-dir",
+        required=True,
+        help="Directory for the quantized ONNX model"
+    )
+    args = parser.parse_args()
+
+    quantize_model(args.model_name, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# backend/tests/conftest.py
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope="session")
+def app_instance():
+    """The FastAPI app, imported lazily.
+
+    app.main does its heavy lifting (DB engine, middleware, router
+    wiring) at module level, so deferring the import into a fixture
+    keeps collect-only runs from paying for it; the first fixture that
+    needs the app triggers the import exactly once per session.
+    """
+    from app.main import app
+    from app.db.database import init_db
+
+    # The lifespan only auto-creates tables when debug and
+    # auto_create_tables are both set (both default False), so the suite
+    # owns its schema: create it once before any client touches the app
+    init_db()
+    return app
+
+@pytest.fixture(scope="session")
+def client(app_instance):
+    """Shared TestClient for the whole test session.
+
+    The context-manager form runs app startup/shutdown exactly once per
+    session instead of once per module-level client, which is where most
+    of the per-file overhead went.
+    """
+    with TestClient(app_instance) as test_client:
+        yield test_client
+
+@pytest.fixture(scope="session")
+def asgi_transport(app_instance):
+    """Shared in-process ASGI transport for httpx.AsyncClient tests.
+
+    Tests that need overlapping requests build an AsyncClient on this
+    transport inside an asyncio.run block; calls go straight into the
+    app with no TestClient portal thread in between.
+    """
+    return httpx.ASGITransport(app=app_instance)
@@ -1,19 +1,32 @@
 # backend/tests/e2e/test_complete_chat_flow.py
 import pytest
 import asyncio
-from fastapi.testclient import TestClient
-from unittest.mock import patch, Mock
+import httpx
+from unittest.mock import patch, Mock, AsyncMock
 import time
 
-from app.main import app
 from app.core.config import settings
 
-client = TestClient(app)
+# Shared agent reply for tests that only care about status codes or a
+# fixed message: built once instead of per iteration
+_DEFAULT_AGENT_REPLY = {
+    "message": "ok",
+    "sources": [],
+    "requires_escalation": False
+}
+
+# Module-scoped: one session serves every test that just needs somewhere
+# to post messages, saving a /chat/sessions round-trip per test
+@pytest.fixture(scope="module")
+def session_id(client):
+    response = client.post("/chat/sessions", json={"user_id": "shared-test-user"})
+    assert response.status_code == 200
+    return response.json()["session_id"]
 
 class TestCompleteChatFlow:
     """End-to-end tests for the complete chat flow"""
     
-    def test_complete_chat_session(self):
+    def test_complete_chat_session(self, client):
         """Test a complete chat session from start to finish"""
         # Step 1: Create a new session
         session_response = client.post("/chat/sessions", json={"user_id": "test-user-123"})
@@ -23,68 +36,69 @@ class TestCompleteChatFlow:
         session_id = session_data["session_id"]
         assert session_id is not None
         
-        # Step 2: Send initial message
-        with patch('app.api.routes.chat.chat_agent.send_message') as mock_send:
-            mock_send.return_value = {
-                "message": "Hello! How can I help you today?",
-                "sources": [],
-                "requires_escalation": False
-            }
-            
+        # One patch for the whole conversation: side_effect hands out the
+        # per-step replies in order, so the patcher is entered once
+        # instead of once per step
+        with patch('app.api.routes.chat.chat_agent.send_message',
+                   new_callable=AsyncMock) as mock_send:
+            mock_send.side_effect = [
+                {
+                    "message": "Hello! How can I help you today?",
+                    "sources": [],
+                    "requires_escalation": False
+                },
+                {
+                    "message": "I see you've uploaded an invoice. Let me help you with that.",
+                    "sources": [
+                        {
+                            "id": "doc1",
+                            "content": "Information about invoice processing",
+                            "metadata": {"source": "invoice_kb.pdf"},
+                            "distance": 0.2
+                        }
+                    ],
+                    "requires_escalation": False
+                },
+                {
+                    "message": "I'm escalating your issue to a human agent. Ticket ID: TICKET-123",
+                    "sources": [],
+                    "requires_escalation": True
+                },
+            ]
+
+            # Step 2: Send initial message
             message_response = client.post(
                 f"/chat/sessions/{session_id}/messages",
                 data={"message": "Hello, I need help with my order"}
             )
             assert message_response.status_code == 200
-            
+
             message_data = message_response.json()
             assert message_data["message"] == "Hello! How can I help you today?"
             assert message_data["requires_escalation"] is False
-        
-        # Step 3: Send message with attachment
-        with patch('app.api.routes.chat.chat_agent.send_message') as mock_send:
-            mock_send.return_value = {
-                "message": "I see you've uploaded an invoice. Let me help you with that.",
-                "sources": [
-                    {
-                        "id": "doc1",
-                        "content": "Information about invoice processing",
-                        "metadata": {"source": "invoice_kb.pdf"},
-                        "distance": 0.2
-                    }
-                ],
-                "requires_escalation": False
-            }
-            
-            # Create a mock file
+
+            # Step 3: Send message with attachment
             mock_file = ("test_invoice.pdf", b"mock pdf content", "application/pdf")
-            
+
             message_response = client.post(
                 f"/chat/sessions/{session_id}/messages",
                 data={"message": "Here's my invoice"},
                 files={"attachments": mock_file}
             )
             assert message_response.status_code == 200
-            
+
             message_data = message_response.json()
             assert "invoice" in message_data["message"]
             assert len(message_data["sources"]) == 1
             assert message_data["sources"][0]["metadata"]["source"] == "invoice_kb.pdf"
-        
-        # Step 4: Trigger escalation
-        with patch('app.api.routes.chat.chat_agent.send_message') as mock_send:
-            mock_send.return_value = {
-                "message": "I'm escalating your issue to a human agent. Ticket ID: TICKET-123",
-                "sources": [],
-                "requires_escalation": True
-            }
-            
+
+            # Step 4: Trigger escalation
             message_response = client.post(
                 f"/chat/sessions/{session_id}/messages",
                 data={"message": "This is too complex, I need to speak to a human"}
             )
             assert message_response.status_code == 200
-            
+
             message_data = message_response.json()
             assert message_data["requires_escalation"] is True
             assert "TICKET-123" in message_data["message"]
@@ -105,83 +119,84 @@ class TestCompleteChatFlow:
         assert health_data["status"] in ["healthy", "unhealthy"]
         assert "components" in health_data
     
-    def test_error_handling(self):
+    def test_error_handling(self, client, session_id):
         """Test error handling in the chat flow"""
         # Test invalid session ID
         response = client.get("/chat/sessions/invalid-session-id/history")
         assert response.status_code == 404
-        
+
         # Test empty message
-        session_response = client.post("/chat/sessions", json={"user_id": "test-user"})
-        session_id = session_response.json()["session_id"]
-        
         response = client.post(
             f"/chat/sessions/{session_id}/messages",
             data={"message": ""}
         )
         assert response.status_code == 422  # Validation error
     
-    def test_concurrent_sessions(self):
+    def test_concurrent_sessions(self, asgi_transport):
         """Test handling multiple concurrent sessions"""
-        sessions = []
-        
-        # Create multiple sessions
-        for i in range(5):
-            response = client.post("/chat/sessions", json={"user_id": f"test-user-{i}"})
+        # Both phases run as gather bursts over an in-process ASGI
+        # transport: session creation and the messages each cost ~one
+        # round-trip of wall time instead of one per session
+        async def run_sessions():
+            async with httpx.AsyncClient(
+                transport=asgi_transport, base_url="http://test"
+            ) as async_client:
+                create_responses = await asyncio.gather(*[
+                    async_client.post("/chat/sessions", json={"user_id": f"test-user-{i}"})
+                    for i in range(5)
+                ])
+
+                sessions = []
+                for response in create_responses:
+                    assert response.status_code == 200
+                    sessions.append(response.json()["session_id"])
+
+                return await asyncio.gather(*[
+                    async_client.post(
+                        f"/chat/sessions/{session_id}/messages",
+                        data={"message": f"Concurrent message for {session_id}"}
+                    )
+                    for session_id in sessions
+                ])
+
+        with patch('app.api.routes.chat.chat_agent.send_message',
+                   new_callable=AsyncMock) as mock_send:
+            mock_send.return_value = _DEFAULT_AGENT_REPLY
+
+            responses = asyncio.run(run_sessions())
+
+        # Verify all responses are successful
+        for response in responses:
             assert response.status_code == 200
-            sessions.append(response.json()["session_id"])
-        
-        # Send messages to all sessions concurrently
-        with patch('app.api.routes.chat.chat_agent.send_message') as mock_send:
+            assert response.json()["message"] == _DEFAULT_AGENT_REPLY["message"]
+    
+    # Parametrized so each file type is its own test: failures surface
+    # individually and xdist can schedule them independently
+    @pytest.mark.parametrize("filename,content,content_type", [
+        ("test.txt", b"plain text content", "text/plain"),
+        ("test.jpg", b"fake jpg content", "image/jpeg"),
+        ("test.pdf", b"fake pdf content", "application/pdf"),
+    ])
+    def test_attachment_processing(self, client, session_id, filename, content, content_type):
+        """Test attachment processing for each supported file type"""
+        with patch('app.api.routes.chat.chat_agent.send_message',
+                   new_callable=AsyncMock) as mock_send:
             mock_send.return_value = {
-                "message": "Response to concurrent message",
+                "message": f"Processed {filename} successfully",
                 "sources": [],
                 "requires_escalation": False
             }
-            
-            responses = []
-            for session_id in sessions:
-                response = client.post(
-                    f"/chat/sessions/{session_id}/messages",
-                    data={"message": f"Concurrent message for {session_id}"}
-                )
-                responses.append(response)
-            
-            # Verify all responses are successful
-            for response in responses:
-                assert response.status_code == 200
-                assert response.json()["message"] == "Response to concurrent message"
-    
-    def test_attachment_processing(self):
-        """Test attachment processing in various scenarios"""
-        # Create session
-        session_response = client.post("/chat/sessions", json={"user_id": "test-user"})
-        session_id = session_response.json()["session_id"]
-        
-        # Test different file types
-        test_files = [
-            ("test.txt", b"plain text content", "text/plain"),
-            ("test.jpg", b"fake jpg content", "image/jpeg"),
-            ("test.pdf", b"fake pdf content", "application/pdf"),
-        ]
-        
-        for filename, content, content_type in test_files:
-            with patch('app.api.routes.chat.chat_agent.send_message') as mock_send:
-                mock_send.return_value = {
-                    "message": f"Processed {filename} successfully",
-                    "sources": [],
-                    "requires_escalation": False
-                }
-                
-                response = client.post(
-                    f"/chat/sessions/{session_id}/messages",
-                    data={"message": f"Uploading {filename}"},
-                    files={"attachments": (filename, content, content_type)}
-                )
-                assert response.status_code == 200
-                assert filename in response.json()["message"]
-        
-        # Test invalid file type
+
+            response = client.post(
+                f"/chat/sessions/{session_id}/messages",
+                data={"message": f"Uploading {filename}"},
+                files={"attachments": (filename, content, content_type)}
+            )
+            assert response.status_code == 200
+            assert filename in response.json()["message"]
+
+    def test_attachment_invalid_file_type(self, client, session_id):
+        """Test that unsupported attachment types are rejected"""
         response = client.post(
             f"/chat/sessions/{session_id}/messages",
             data={"message": "Uploading invalid file"},
@@ -189,41 +204,40 @@ class TestCompleteChatFlow:
         )
         assert response.status_code == 422  # Validation error
     
-    def test_rate_limiting(self):
+    def test_rate_limiting(self, client, asgi_transport, session_id):
         """Test rate limiting functionality"""
-        # Create session
-        session_response = client.post("/chat/sessions", json={"user_id": "test-user"})
-        session_id = session_response.json()["session_id"]
-        
-        # Send multiple messages rapidly
-        responses = []
-        for i in range(35):  # Exceed the rate limit of 30 messages per minute
-            with patch('app.api.routes.chat.chat_agent.send_message') as mock_send:
-                mock_send.return_value = {
-                    "message": f"Message {i}",
-                    "sources": [],
-                    "requires_escalation": False
-                }
-                
-                response = client.post(
-                    f"/chat/sessions/{session_id}/messages",
-                    data={"message": f"Message {i}"}
-                )
-                responses.append(response)
+        # Fire all 35 requests as one gather burst instead of 35 serial
+        # round-trips: ~1x round-trip of wall time, and a truer probe of
+        # the limiter's burst behavior than a paced loop
+        async def send_burst():
+            async with httpx.AsyncClient(
+                transport=asgi_transport, base_url="http://test"
+            ) as async_client:
+                return await asyncio.gather(*[
+                    async_client.post(
+                        f"/chat/sessions/{session_id}/messages",
+                        data={"message": f"Message {i}"}
+                    )
+                    for i in range(35)  # Exceed the limit of 30 per minute
+                ])
+
+        with patch('app.api.routes.chat.chat_agent.send_message',
+                   new_callable=AsyncMock) as mock_send:
+            mock_send.return_value = _DEFAULT_AGENT_REPLY
+
+            responses = asyncio.run(send_burst())
         
         # Check that some responses are rate limited
         rate_limited_count = sum(1 for r in responses if r.status_code == 429)
         assert rate_limited_count > 0, "Expected some requests to be rate limited"
     
-    def test_system_resilience(self):
+    def test_system_resilience(self, client, session_id):
         """Test system resilience under various failure conditions"""
-        # Create session
-        session_response = client.post("/chat/sessions", json={"user_id": "test-user"})
-        session_id = session_response.json()["session_id"]
-        
         # Test agent framework failure
-        with patch('app.api.routes.chat.chat_agent.send_message') as mock_send:
-            mock_send.side_effect = Exception("Agent framework unavailable")
+        with patch('app.api.routes.chat.chat_agent.send_message',
+                   new_callable=AsyncMock) as mock_send:
+            # Assign the class: Mock instantiates it lazily on call
+            mock_send.side_effect = RuntimeError
             
             response = client.post(
                 f"/chat/sessions/{session_id}/messages",
@@ -233,13 +247,14 @@ class TestCompleteChatFlow:
         
         # Test database failure
         with patch('app.db.database.get_db') as mock_db:
-            mock_db.side_effect = Exception("Database unavailable")
+            mock_db.side_effect = RuntimeError
             
             response = client.get(f"/chat/sessions/{session_id}/history")
             assert response.status_code == 500
         
         # Test recovery after failure
-        with patch('app.api.routes.chat.chat_agent.send_message') as mock_send:
+        with patch('app.api.routes.chat.chat_agent.send_message',
+                   new_callable=AsyncMock) as mock_send:
             mock_send.return_value = {
                 "message": "System recovered",
                 "sources": [],
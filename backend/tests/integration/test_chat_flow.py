@@ -1,12 +1,8 @@
 # backend/tests/integration/test_chat_flow.py
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import patch, Mock
-from app.main import app
+from unittest.mock import patch, Mock, AsyncMock
 
-client = TestClient(app)
-
-def test_create_session():
+def test_create_session(client):
     # Act
     response = client.post("/chat/sessions", json={"user_id": "test-user"})
     
@@ -17,13 +13,14 @@ def test_create_session():
     assert "thread_id" in data
     assert data["message"] == "Session created successfully"
 
-def test_send_message():
+def test_send_message(client):
     # First create a session
     session_response = client.post("/chat/sessions", json={"user_id": "test-user"})
     session_id = session_response.json()["session_id"]
     
     # Mock the chat agent
-    with patch('app.api.routes.chat.chat_agent.send_message') as mock_send:
+    with patch('app.api.routes.chat.chat_agent.send_message',
+                   new_callable=AsyncMock) as mock_send:
         mock_send.return_value = {
             "message": "This is a test response",
             "sources": [],
@@ -43,7 +40,7 @@ def test_send_message():
         assert data["sources"] == []
         assert data["requires_escalation"] is False
 
-def test_get_chat_history():
+def test_get_chat_history(client):
     # First create a session
     session_response = client.post("/chat/sessions", json={"user_id": "test-user"})
     session_id = session_response.json()["session_id"]
@@ -57,7 +54,7 @@ def test_get_chat_history():
     assert data["session_id"] == session_id
     assert "messages" in data
 
-def test_session_not_found():
+def test_session_not_found(client):
     # Act
     response = client.get("/chat/sessions/non-existent-session/history")
     
@@ -1,17 +1,29 @@
 # backend/tests/unit/test_attachment_tool.py
 import pytest
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, mock_open
 from app.tools.attachment_tool import AttachmentTool
 
-@pytest.fixture
+# Module-scoped: the tool is stateless, one instance serves every test
+@pytest.fixture(scope="module")
 def attachment_tool():
     return AttachmentTool()
 
+# One patcher for the whole module instead of per-test start/stop; tests
+# needing a different conversion result reassign convert.return_value
+@pytest.fixture(autouse=True, scope="module")
+def _stub_markitdown():
+    with patch('app.tools.attachment_tool.markitdown') as mock_markitdown:
+        mock_markitdown.convert.return_value = "Extracted text from PDF"
+        yield mock_markitdown
+
 @pytest.fixture
 def mock_db():
-    with patch('app.tools.attachment_tool.get_db') as mock_get_db:
+    # The tool opens its sessions via `with ScopedSession() as db`, so the
+    # double has to answer the context-manager protocol
+    with patch('app.tools.attachment_tool.ScopedSession') as mock_scoped:
         mock_session = Mock()
-        mock_get_db.return_value.__next__.return_value = mock_session
+        mock_scoped.return_value.__enter__.return_value = mock_session
         yield mock_session
 
 def test_process_attachment_success(attachment_tool, mock_db):
@@ -24,35 +36,39 @@ def test_process_attachment_success(attachment_tool, mock_db):
         "content_type": "application/pdf"
     }
     
-    # Mock markitdown
-    with patch('app.tools.attachment_tool.markitdown') as mock_markitdown:
-        mock_markitdown.convert.return_value = "Extracted text from PDF"
-        
-        # Act
+    # Miss both caches so the conversion path actually runs: no Redis
+    # entry, no durable cache row, and a stubbed content hash since the
+    # file itself doesn't exist
+    mock_db.get.return_value = None
+
+    # Act (markitdown is stubbed module-wide by _stub_markitdown)
+    with patch.object(AttachmentTool, '_hash_file', return_value="a" * 16), \
+         patch('app.tools.attachment_tool.cache_manager') as mock_cache:
+        mock_cache.get.return_value = None
         result = attachment_tool.execute(parameters)
-        
-        # Assert
-        assert result["success"] is True
-        assert "attachment_id" in result
-        assert result["processed_text"] == "Extracted text from PDF"
-        mock_db.add.assert_called_once()
-        mock_db.commit.assert_called_once()
+
+    # Assert
+    assert result["success"] is True
+    assert "attachment_id" in result
+    assert result["processed_text"] == "Extracted text from PDF"
+    mock_db.merge.assert_called_once()  # durable cache row
+    mock_db.add.assert_called_once()
+    mock_db.commit.assert_called_once()
+    mock_cache.set.assert_called_once()
 
 def test_get_attachment_text_success(attachment_tool, mock_db):
     # Arrange
-    from app.db.models import Attachment
     parameters = {
         "action": "get_attachment_text",
         "attachment_id": "test-attachment-id"
     }
     
-    # Mock database query
-    mock_attachment = Mock(spec=Attachment)
-    mock_attachment.id = "test-attachment-id"
-    mock_attachment.filename = "test.pdf"
-    mock_attachment.processed_text = "Extracted text from PDF"
-    
-    mock_db.query.return_value.filter.return_value.first.return_value = mock_attachment
+    # The tool reads via db.execute(select(columns)).first(); a plain
+    # SimpleNamespace row double covers the two fields it pulls out
+    mock_db.execute.return_value.first.return_value = SimpleNamespace(
+        filename="test.pdf",
+        processed_text="Extracted text from PDF",
+    )
     
     # Act
     result = attachment_tool.execute(parameters)
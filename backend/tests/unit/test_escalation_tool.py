@@ -2,7 +2,8 @@
 import pytest
 from app.tools.escalation_tool import EscalationTool
 
-@pytest.fixture
+# Module-scoped: the tool is stateless, one instance serves every test
+@pytest.fixture(scope="module")
 def escalation_tool():
     return EscalationTool()
 
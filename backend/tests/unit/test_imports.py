@@ -0,0 +1,23 @@
+# backend/tests/unit/test_imports.py
+import importlib
+
+import pytest
+
+# Modules that must import cleanly; broken relative imports here surface as
+# NameError/ImportError inside exception handlers at runtime, which is far
+# more expensive (and harder to diagnose) than failing fast in CI
+MODULES = [
+    "app.core.config",
+    "app.core.cache",
+    "app.core.security",
+    "app.core.logging",
+    "app.db.database",
+    "app.db.models",
+    "app.api.dependencies",
+    "app.api.routes.health",
+    "app.api.routes.metrics",
+]
+
+@pytest.mark.parametrize("module_name", MODULES)
+def test_module_imports(module_name):
+    importlib.import_module(module_name)
@@ -1,17 +1,21 @@
 # backend/tests/unit/test_memory_tool.py
 import pytest
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 from app.tools.memory_tool import MemoryTool
 
-@pytest.fixture
+# Module-scoped: the tool is stateless, one instance serves every test
+@pytest.fixture(scope="module")
 def memory_tool():
     return MemoryTool()
 
 @pytest.fixture
 def mock_db():
-    with patch('app.tools.memory_tool.get_db') as mock_get_db:
+    # The tool opens its sessions via `with ScopedSession() as db`, so the
+    # double has to answer the context-manager protocol
+    with patch('app.tools.memory_tool.ScopedSession') as mock_scoped:
         mock_session = Mock()
-        mock_get_db.return_value.__next__.return_value = mock_session
+        mock_scoped.return_value.__enter__.return_value = mock_session
         yield mock_session
 
 def test_store_memory_success(memory_tool, mock_db):
@@ -26,28 +30,33 @@ def test_store_memory_success(memory_tool, mock_db):
     # Act
     result = memory_tool.execute(parameters)
     
-    # Assert
+    # Assert: the store path issues one ON CONFLICT upsert statement
+    # rather than a unit-of-work add
     assert result["success"] is True
-    mock_db.add.assert_called_once()
+    mock_db.execute.assert_called_once()
     mock_db.commit.assert_called_once()
 
 def test_retrieve_memory_success(memory_tool, mock_db):
     # Arrange
-    from app.db.models import MemoryEntry
     parameters = {
         "action": "retrieve",
         "session_id": "test-session",
         "key": "user_preference"
     }
     
-    # Mock database query
-    mock_entry = Mock(spec=MemoryEntry)
-    mock_entry.key = "user_preference"
-    mock_entry.value = "dark_mode"
-    mock_entry.timestamp = Mock()
-    mock_entry.timestamp.isoformat.return_value = "2023-01-01T00:00:00"
-    
-    mock_db.query.return_value.filter.return_value.all.return_value = [mock_entry]
+    # Plain-attribute double: the tool only reads these fields, and
+    # SimpleNamespace skips Mock's spec introspection entirely
+    mock_entry = SimpleNamespace(
+        key="user_preference",
+        value="dark_mode",
+        timestamp=SimpleNamespace(isoformat=lambda: "2023-01-01T00:00:00"),
+    )
+
+    # The tool chains one filter per criterion (session_id, then key), so
+    # make filter() return the same query double however often it's called
+    mock_query = mock_db.query.return_value
+    mock_query.filter.return_value = mock_query
+    mock_query.all.return_value = [mock_entry]
     
     # Act
     result = memory_tool.execute(parameters)
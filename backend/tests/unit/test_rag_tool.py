@@ -3,11 +3,19 @@ import pytest
 from unittest.mock import Mock, patch
 from app.tools.rag_tool import RAGTool
 
-@pytest.fixture
+# Module-scoped: one RAGTool (and one patcher entry/exit) per file
+# instead of per test; the autouse reset below keeps tests independent.
+# The singleton factories are what the tool calls now, not the classes.
+@pytest.fixture(scope="module")
 def rag_tool():
-    with patch('app.tools.rag_tool.ChromaClient'), \
-         patch('app.tools.rag_tool.EmbeddingModel'):
-        return RAGTool()
+    with patch('app.tools.rag_tool.get_chroma_client'), \
+         patch('app.tools.rag_tool.get_embedding_model'):
+        yield RAGTool()
+
+@pytest.fixture(autouse=True)
+def _reset_rag_mocks(rag_tool):
+    rag_tool.chroma_client.reset_mock(return_value=True, side_effect=True)
+    rag_tool.embedding_model.reset_mock(return_value=True, side_effect=True)
 
 def test_search_success(rag_tool):
     # Arrange